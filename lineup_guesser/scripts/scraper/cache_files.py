@@ -0,0 +1,72 @@
+"""
+Reading and writing PLClient cache entries.
+
+An entry is `<md5 cache key>.json` in the cache directory. Its content is the
+response JSON, either as plain text or gzip-compressed in place (see
+`cache_tool.py compress`); readers detect which from the magic bytes, so file
+names and cache keys never change.
+"""
+
+import gzip
+import json
+import os
+import re
+import threading
+import zlib
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = Path(__file__).parent / ".cache"
+GZIP_MAGIC = b"\x1f\x8b"
+ENTRY_NAME = re.compile(r"[0-9a-f]{32}\.json")
+
+
+def is_cache_entry(path: Path) -> bool:
+    """True for response entries, as opposed to the index, cursor or rejected list."""
+    return ENTRY_NAME.fullmatch(path.name) is not None
+
+
+def iter_entries(cache_dir: Path):
+    """Every response entry directly in cache_dir (subdirectories are not entries)."""
+    for entry in os.scandir(cache_dir):
+        if entry.is_file() and ENTRY_NAME.fullmatch(entry.name):
+            yield Path(entry.path)
+
+
+def is_compressed(raw: bytes) -> bool:
+    return raw[:2] == GZIP_MAGIC
+
+
+def payload_bytes(raw: bytes) -> bytes:
+    """Entry bytes as plain JSON text, decompressing them if needed."""
+    if not is_compressed(raw):
+        return raw
+    try:
+        return gzip.decompress(raw)
+    except (OSError, EOFError, zlib.error) as e:
+        raise ValueError(f"bad gzip stream: {e}") from e
+
+
+def decode_payload(raw: bytes):
+    """Decode entry bytes. Any truncation or corruption surfaces as ValueError."""
+    return json.loads(payload_bytes(raw))
+
+
+def encode_payload(data, compress: bool = False, level: int = 9) -> bytes:
+    raw = json.dumps(data).encode("utf-8")
+    # mtime=0 keeps the output deterministic, so identical payloads stay byte-identical
+    return gzip.compress(raw, compresslevel=level, mtime=0) if compress else raw
+
+
+def read_cache_file(path: Path):
+    return decode_payload(path.read_bytes())
+
+
+def write_bytes_atomic(path: Path, raw: bytes):
+    """Write via a temp file and rename, so concurrent readers never see a partial file."""
+    tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(raw)
+    tmp.replace(path)
+
+
+def write_cache_file(path: Path, data, compress: bool = False):
+    write_bytes_atomic(path, encode_payload(data, compress))
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Maintenance for the PLClient response cache (.cache/*.json).
+
+Entries are classified by payload shape: fixture details, fixture listing
+pages and the season list. Listings change while a season is running and
+details change until the fixture is completed, so only those are evicted;
+details of completed fixtures are kept forever. Every command reads the
+entries in parallel worker processes.
+
+- stats     entry counts and sizes by endpoint type and age
+- evict     delete stale listings and details cached before full time
+- dedupe    hardlink entries with byte-identical payloads
+- compress  gzip entries in place (--decompress undoes it); readers detect either
+- verify    decode every entry and move unreadable ones to .cache/quarantine
+
+Evicted and quarantined entries are also dropped from the fixture index,
+and a missing entry is simply refetched on next use.
+
+Usage:
+    python cache_tool.py stats
+    python cache_tool.py evict [--listings-older-than 7] [--incomplete-older-than 1] [--dry-run]
+    python cache_tool.py dedupe [--dry-run]
+    python cache_tool.py compress [--level 9] [--decompress]
+    python cache_tool.py verify [--dry-run]
+"""
+
+import argparse
+import logging
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from hashlib import sha256
+from pathlib import Path
+from typing import NamedTuple
+
+from cache_files import decode_payload, encode_payload, is_compressed, iter_entries, write_bytes_atomic
+from fbref_client import DEFAULT_CACHE_DIR
+from fixture_index import FixtureIndex, is_fixture_listing, is_match_detail
+from sampling import COMPLETED_STATUS
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("fixture_detail", "fixtures", "seasons", "other", "corrupt")
+AGE_BUCKETS = (("<1d", 1), ("<7d", 7), ("<30d", 30), ("<1y", 365), ("older", float("inf")))
+DAY = 24 * 60 * 60
+STALE_TMP_AGE = 60 * 60  # temp files older than this are left over from a crashed write
+
+
+class Entry(NamedTuple):
+    path: Path
+    kind: str
+    size: int
+    mtime: float
+    inode: tuple[int, int]
+    compressed: bool
+    digest: str
+    status: str | None = None
+    error: str | None = None
+
+
+def entry_kind(data) -> str:
+    if is_match_detail(data):
+        return "fixture_detail"
+    if is_fixture_listing(data):
+        return "fixtures"
+    content = data.get("content") if isinstance(data, dict) else None
+    if isinstance(content, list):
+        if content and isinstance(content[0], dict) and "label" in content[0]:
+            return "seasons"
+        # Empty page past the end of a listing
+        return "fixtures"
+    return "other"
+
+
+def inspect_entry(path: Path) -> Entry | None:
+    """Read and classify one entry. Runs in a worker process."""
+    try:
+        st = path.stat()
+        raw = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    common = {
+        "path": path,
+        "size": st.st_size,
+        "mtime": st.st_mtime,
+        "inode": (st.st_dev, st.st_ino),
+        "compressed": is_compressed(raw),
+        "digest": sha256(raw).hexdigest(),
+    }
+    try:
+        data = decode_payload(raw)
+    except ValueError as e:
+        return Entry(kind="corrupt", error=str(e), **common)
+    kind = entry_kind(data)
+    status = data.get("status") if kind == "fixture_detail" else None
+    return Entry(kind=kind, status=status, **common)
+
+
+def scan(cache_dir: Path, workers: int) -> list[Entry]:
+    paths = list(iter_entries(cache_dir))
+    if workers <= 1 or len(paths) < 100:
+        return [e for e in map(inspect_entry, paths) if e]
+    chunksize = max(1, min(512, len(paths) // (workers * 8)))
+    with ProcessPoolExecutor(workers) as pool:
+        return [e for e in pool.map(inspect_entry, paths, chunksize=chunksize) if e]
+
+
+def cached_before_full_time(e: Entry) -> bool:
+    # Details stream-parsed by older clients carry no status; treat those as unknown, not incomplete
+    return e.kind == "fixture_detail" and e.status is not None and e.status != COMPLETED_STATUS
+
+
+def age_bucket(mtime: float, now: float) -> str:
+    age_days = (now - mtime) / DAY
+    return next(label for label, limit in AGE_BUCKETS if age_days < limit)
+
+
+def _forget(cache_dir: Path, keys: list[str]):
+    index_path = cache_dir / "index.sqlite"
+    if keys and index_path.exists():
+        index = FixtureIndex(index_path)
+        index.forget(keys)
+        index.close()
+
+
+# -- commands -----------------------------------------------------------------
+
+
+def print_stats(entries: list[Entry]):
+    now = time.time()
+    by_kind: dict[str, list[Entry]] = defaultdict(list)
+    for e in entries:
+        by_kind[e.kind].append(e)
+
+    buckets = [label for label, _ in AGE_BUCKETS]
+    print(f"{'Type':<15} {'Entries':>8} {'KiB':>10} {'Gzipped':>8} " + " ".join(f"{b:>7}" for b in buckets))
+    for kind in KINDS:
+        group = by_kind.get(kind)
+        if not group:
+            continue
+        ages = defaultdict(int)
+        for e in group:
+            ages[age_bucket(e.mtime, now)] += 1
+        print(
+            f"{kind:<15} {len(group):>8} {sum(e.size for e in group) / 1024:>10.0f} "
+            f"{sum(e.compressed for e in group):>8} " + " ".join(f"{ages[b]:>7}" for b in buckets)
+        )
+
+    logical = sum(e.size for e in entries)
+    on_disk = sum({e.inode: e.size for e in entries}.values())
+    incomplete = sum(1 for e in entries if cached_before_full_time(e))
+    print(f"{len(entries)} entries, {logical / 1024**2:.1f} MiB ({on_disk / 1024**2:.1f} MiB on disk after hardlinks)")
+    if incomplete:
+        print(f"{incomplete} fixture details were cached before full time")
+
+
+def evict(cache_dir: Path, entries: list[Entry], listings_days: float, incomplete_days: float, dry_run: bool):
+    now = time.time()
+    stale = [
+        e
+        for e in entries
+        if (e.kind in ("fixtures", "seasons") and now - e.mtime > listings_days * DAY)
+        or (cached_before_full_time(e) and now - e.mtime > incomplete_days * DAY)
+    ]
+    tmp_files = [p for p in cache_dir.glob("*.tmp") if now - p.stat().st_mtime > STALE_TMP_AGE]
+
+    freed = sum(e.size for e in stale) + sum(p.stat().st_size for p in tmp_files)
+    verb = "Would evict" if dry_run else "Evicted"
+    logger.info(f"{verb} {len(stale)} entries and {len(tmp_files)} stale temp files ({freed / 1024:.0f} KiB)")
+    if dry_run:
+        return
+    for path in [e.path for e in stale] + tmp_files:
+        path.unlink(missing_ok=True)
+    _forget(cache_dir, [e.path.stem for e in stale])
+
+
+def dedupe(entries: list[Entry], dry_run: bool):
+    by_digest: dict[str, list[Entry]] = defaultdict(list)
+    for e in entries:
+        if e.kind != "corrupt":
+            by_digest[e.digest].append(e)
+
+    linked = saved = 0
+    for group in by_digest.values():
+        if len(group) < 2:
+            continue
+        keep, *rest = sorted(group, key=lambda e: e.path.name)
+        for e in rest:
+            if e.inode == keep.inode:
+                continue
+            linked += 1
+            saved += e.size
+            if dry_run:
+                continue
+            # Link next to the target and rename over it, so the entry never goes missing.
+            # PLClient replaces entries rather than writing into them, which breaks the link.
+            tmp = e.path.with_suffix(".link.tmp")
+            tmp.unlink(missing_ok=True)
+            os.link(keep.path, tmp)
+            tmp.replace(e.path)
+    verb = "Would link" if dry_run else "Linked"
+    logger.info(f"{verb} {linked} duplicate entries, saving {saved / 1024:.0f} KiB")
+
+
+def recompress_entry(path: Path, compress: bool, level: int) -> tuple[int, int]:
+    """Rewrite one entry compressed or plain. Returns (bytes before, bytes after). Runs in a worker process."""
+    try:
+        st = path.stat()
+        raw = path.read_bytes()
+        data = decode_payload(raw)
+    except (FileNotFoundError, ValueError):
+        return 0, 0
+    new = encode_payload(data, compress, level)
+    if new != raw:
+        write_bytes_atomic(path, new)
+        # Keep the fetch time: eviction and stats go by it
+        os.utime(path, (st.st_atime, st.st_mtime))
+    return len(raw), len(new)
+
+
+def recompress(entries: list[Entry], compress: bool, level: int, workers: int):
+    paths = [e.path for e in entries if e.kind != "corrupt"]
+    work = partial(recompress_entry, compress=compress, level=level)
+    if workers <= 1 or len(paths) < 100:
+        results = list(map(work, paths))
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(work, paths, chunksize=max(1, min(256, len(paths) // (workers * 8)))))
+    before = sum(r[0] for r in results)
+    after = sum(r[1] for r in results)
+    logger.info(f"Rewrote {len(paths)} entries: {before / 1024**2:.1f} MiB → {after / 1024**2:.1f} MiB")
+
+
+def verify(cache_dir: Path, entries: list[Entry], dry_run: bool):
+    corrupt = [e for e in entries if e.kind == "corrupt"]
+    for e in corrupt:
+        logger.warning(f"  {e.path.name}: {e.error}")
+    logger.info(f"{len(entries) - len(corrupt)} entries OK, {len(corrupt)} unreadable")
+    if dry_run or not corrupt:
+        return
+    quarantine = cache_dir / "quarantine"
+    quarantine.mkdir(exist_ok=True)
+    for e in corrupt:
+        e.path.replace(quarantine / e.path.name)
+    _forget(cache_dir, [e.path.stem for e in corrupt])
+    logger.info(f"Moved {len(corrupt)} entries to {quarantine}; they will be refetched on next use")
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Inspect and maintain the API response cache")
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR, help="Cache directory")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("stats", help="Entry counts and sizes by endpoint type and age")
+
+    e = sub.add_parser("evict", help="Delete stale listings and incomplete fixture details")
+    e.add_argument("--listings-older-than", type=float, default=7, metavar="DAYS",
+                   help="Evict fixture listings and season lists older than this (default: 7)")
+    e.add_argument("--incomplete-older-than", type=float, default=1, metavar="DAYS",
+                   help="Evict details of not yet completed fixtures older than this (default: 1)")
+    e.add_argument("--dry-run", action="store_true", help="Report only")
+
+    d = sub.add_parser("dedupe", help="Hardlink byte-identical entries")
+    d.add_argument("--dry-run", action="store_true", help="Report only")
+
+    c = sub.add_parser("compress", help="Gzip entries in place")
+    c.add_argument("--level", type=int, default=9, choices=range(1, 10), metavar="1-9", help="Gzip level")
+    c.add_argument("--decompress", action="store_true", help="Store entries as plain JSON instead")
+
+    v = sub.add_parser("verify", help="Decode every entry and quarantine unreadable ones")
+    v.add_argument("--dry-run", action="store_true", help="Report only")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    started = time.time()
+    entries = scan(args.cache_dir, args.workers)
+    logger.info(f"Scanned {len(entries)} entries in {time.time() - started:.1f}s")
+
+    if args.command == "stats":
+        print_stats(entries)
+    elif args.command == "evict":
+        evict(args.cache_dir, entries, args.listings_older_than, args.incomplete_older_than, args.dry_run)
+    elif args.command == "dedupe":
+        dedupe(entries, args.dry_run)
+    elif args.command == "compress":
+        recompress(entries, not args.decompress, args.level, args.workers)
+    else:
+        verify(args.cache_dir, entries, args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
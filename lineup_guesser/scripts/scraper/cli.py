@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the scraper tools.
+
+A command's module is imported only when that command runs, so `cli.py
+validate` never loads the HTTP client. Commands separated by `+` run in one
+process and share a Workspace: one API session, one dataset store connection
+and the dataset loaded once. Path options go before the first command and
+apply to every step: standalone tools (cache, index, snapshot, rejected,
+store) are handed the workspace's cache directory, index, rejected list and
+store as their own options. File arguments such as archives, deltas or the
+store's import/export file are still given per step.
+
+`bench` measures the import cost of each command with `python -X importtime`.
+
+Usage:
+    python cli.py scrape --per-season 30 + validate + reprocess
+    python cli.py --output /tmp/matches.json build --force + validate
+    python cli.py cache stats
+    python cli.py bench [--runs 5]
+"""
+
+import argparse
+import importlib
+import logging
+import re
+import sys
+from pathlib import Path
+
+from workspace import Workspace
+
+logger = logging.getLogger(__name__)
+
+SCRIPT_DIR = Path(__file__).parent
+SEPARATOR = "+"
+
+# name → (module, help). Modules with run(args, workspace) share the workspace;
+# the others are standalone tools whose main(argv) is called as is.
+COMMANDS = {
+    "scrape": ("scrape_matches", "Sample fixtures from the API and rebuild the dataset"),
+    "build": ("pipeline", "Incrementally rebuild the dataset from the recorded fixture list"),
+    "validate": ("validate", "Validate the dataset"),
+    "reprocess": ("reprocess", "Drop pre-2010 matches and re-apply last name extraction"),
+    "watch": ("watch", "Ingest newly completed fixtures of the current season"),
+    "index": ("fixture_index", "Query the local fixture cache index"),
+    "cache": ("cache_tool", "Inspect and maintain the API response cache"),
+    "snapshot": ("snapshot", "Export or import a portable snapshot of the API cache"),
+    "rejected": ("negative_cache", "Inspect or clear the rejected-fixture cache"),
+    "store": ("dataset_store", "Manage the SQLite dataset store"),
+    "delta": ("delta", "Diff, apply and verify dataset deltas"),
+    "query": ("query_corpus", "Query the columnar export"),
+}
+
+
+def load_command(name: str):
+    return importlib.import_module(COMMANDS[name][0])
+
+
+def workspace_options(name: str, workspace: Workspace) -> list[str]:
+    """The workspace's paths as a standalone tool's own options; the step's own come after and win."""
+    options = {
+        "cache": ["--cache-dir", workspace.cache_dir],
+        "snapshot": ["--cache-dir", workspace.cache_dir],
+        "index": ["--index", workspace.cache_dir / "index.sqlite"],
+        "rejected": ["--path", workspace.cache_dir / "rejected.json"],
+        "store": ["--store", workspace.store_path],
+    }
+    return [str(option) for option in options.get(name, [])]
+
+
+def split_steps(argv: list[str]) -> list[list[str]]:
+    steps: list[list[str]] = [[]]
+    for arg in argv:
+        if arg == SEPARATOR:
+            steps.append([])
+        else:
+            steps[-1].append(arg)
+    return [step for step in steps if step]
+
+
+def run_steps(steps: list[list[str]], workspace: Workspace) -> bool:
+    # Parse every step before running any, so a typo in the last one does not cost a scrape
+    planned = []
+    for name, *argv in steps:
+        if name not in COMMANDS:
+            raise SystemExit(f"Unknown command {name!r} (expected one of {', '.join(COMMANDS)})")
+        module = load_command(name)
+        if hasattr(module, "run"):
+            parser = argparse.ArgumentParser(prog=f"cli.py {name}", description=COMMANDS[name][1])
+            if hasattr(module, "add_arguments"):
+                module.add_arguments(parser)
+            planned.append((name, module, parser.parse_args(argv)))
+        else:
+            planned.append((name, module, workspace_options(name, workspace) + argv))
+
+    for name, module, args in planned:
+        logger.info(f"== {name}")
+        if isinstance(args, argparse.Namespace):
+            ok = module.run(args, workspace)
+        else:
+            module.main(args)
+            ok = None
+            # Standalone tools may have changed the store behind the workspace's back
+            workspace.set_matches(None)
+        if ok is False:
+            logger.error(f"{name} failed, stopping")
+            return False
+    return True
+
+
+# -- startup benchmark --------------------------------------------------------
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def import_times(code: str) -> dict[str, int]:
+    """Cumulative import time in µs of each top-level module imported by running code."""
+    import subprocess
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=SCRIPT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match and not match.group(3):
+            times[match.group(4)] = int(match.group(2))
+    return times
+
+
+def bench(runs: int):
+    # Modules the interpreter imports anyway, so only each command's own cost is reported
+    baseline = import_times("pass")
+    rows = [("(cli)", "import cli")] + [
+        (name, f"import cli; cli.load_command({name!r})") for name in COMMANDS
+    ]
+    print(f"{'Command':<10} {'Import ms':>10}  Heaviest imports")
+    for name, code in rows:
+        best = None
+        for _ in range(runs):
+            times = {m: t for m, t in import_times(code).items() if m not in baseline}
+            if best is None or sum(times.values()) < sum(best.values()):
+                best = times
+        heaviest = sorted(best.items(), key=lambda kv: kv[1], reverse=True)[:3]
+        print(
+            f"{name:<10} {sum(best.values()) / 1000:>10.1f}  "
+            + ", ".join(f"{m} {t / 1000:.1f}" for m, t in heaviest)
+        )
+
+
+def main():
+    epilog = "commands:\n" + "\n".join(f"  {name:<10} {help}" for name, (_, help) in COMMANDS.items())
+    epilog += "\n  bench      Measure each command's import time (python -X importtime)"
+    epilog += f"\n\nChain commands with '{SEPARATOR}' to run them in one process."
+    parser = argparse.ArgumentParser(
+        description="Premier League lineup scraper",
+        epilog=epilog,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        usage="cli.py [options] command [args] [+ command [args] ...]",
+    )
+    Workspace.add_arguments(parser)
+
+    # Options before the first command belong to the workspace, the rest to the steps
+    argv = sys.argv[1:]
+    first = next((i for i, arg in enumerate(argv) if arg in COMMANDS or arg == "bench"), len(argv))
+    args = parser.parse_args(argv[:first])
+    steps = split_steps(argv[first:])
+    if not steps:
+        parser.print_help()
+        sys.exit(2)
+
+    if steps[0][0] == "bench":
+        bench_parser = argparse.ArgumentParser(prog="cli.py bench", description="Measure each command's import time")
+        bench_parser.add_argument("--runs", type=int, default=3, help="Runs per command; the fastest is reported")
+        bench(bench_parser.parse_args(steps[0][1:]).runs)
+        return
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    workspace = Workspace.from_args(args)
+    try:
+        ok = run_steps(steps, workspace)
+    finally:
+        workspace.close()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Columnar (Parquet / Arrow IPC) export of the transformed matches for analysis.
+
+Writes two flat tables: `matches` (one row per match) and `appearances` (one
+row per starting player). Rows are sorted by season and team so Parquet
+row-group statistics let query_corpus.py skip most of the file for typical
+filters. Requires pyarrow (pip install pyarrow).
+"""
+
+from pathlib import Path
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+MATCH_COLUMNS = (
+    "match_id", "date", "season", "home_team", "away_team",
+    "home_score", "away_score", "home_formation", "away_formation",
+)
+APPEARANCE_COLUMNS = (
+    "match_id", "date", "season", "team", "opponent", "side", "formation",
+    "slot", "name", "last_name", "nationality", "age", "shirt_number", "position",
+)
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise RuntimeError("Columnar export needs pyarrow: pip install pyarrow") from e
+
+
+def _score(score: str) -> tuple[int | None, int | None]:
+    try:
+        home, away = score.split("-")
+        return int(home), int(away)
+    except (AttributeError, ValueError):
+        return None, None
+
+
+def match_rows(matches: list[dict]) -> dict[str, list]:
+    columns: dict[str, list] = {c: [] for c in MATCH_COLUMNS}
+    for m in matches:
+        home_score, away_score = _score(m["score"])
+        columns["match_id"].append(m["id"])
+        columns["date"].append(m["date"])
+        columns["season"].append(m["season"])
+        columns["home_team"].append(m["homeTeam"])
+        columns["away_team"].append(m["awayTeam"])
+        columns["home_score"].append(home_score)
+        columns["away_score"].append(away_score)
+        columns["home_formation"].append(m["homeLineup"]["formation"])
+        columns["away_formation"].append(m["awayLineup"]["formation"])
+    return columns
+
+
+def appearance_rows(matches: list[dict]) -> dict[str, list]:
+    columns: dict[str, list] = {c: [] for c in APPEARANCE_COLUMNS}
+    for m in matches:
+        for side, team, opponent in (
+            ("home", m["homeTeam"], m["awayTeam"]),
+            ("away", m["awayTeam"], m["homeTeam"]),
+        ):
+            lineup = m[f"{side}Lineup"]
+            for slot, p in enumerate(lineup["players"]):
+                columns["match_id"].append(m["id"])
+                columns["date"].append(m["date"])
+                columns["season"].append(m["season"])
+                columns["team"].append(team)
+                columns["opponent"].append(opponent)
+                columns["side"].append(side)
+                columns["formation"].append(lineup["formation"])
+                columns["slot"].append(slot)
+                columns["name"].append(p["name"])
+                columns["last_name"].append(p["lastName"])
+                columns["nationality"].append(p["nationality"])
+                columns["age"].append(p["age"] or None)
+                columns["shirt_number"].append(p["shirtNumber"] or None)
+                columns["position"].append(p["position"])
+    return columns
+
+
+def _table(columns: dict[str, list], sort_keys: list[str]):
+    import pyarrow as pa
+
+    table = pa.table(columns).sort_by([(k, "ascending") for k in sort_keys])
+    # Low-cardinality text columns compress and filter much better as dictionaries
+    for name in ("season", "team", "opponent", "side", "formation", "nationality", "position",
+                 "home_team", "away_team", "home_formation", "away_formation"):
+        if name in table.column_names:
+            index = table.column_names.index(name)
+            table = table.set_column(index, name, table[name].dictionary_encode())
+    return table
+
+
+def write_columnar(matches: list[dict], output_dir: Path, fmt: str = "parquet") -> dict[str, Path]:
+    """Write the matches and appearances tables. Returns {table name: path}."""
+    _require_pyarrow()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown columnar format {fmt!r} (expected one of {', '.join(FORMATS)})")
+
+    tables = {
+        "matches": _table(match_rows(matches), ["season", "date"]),
+        "appearances": _table(appearance_rows(matches), ["season", "team", "date"]),
+    }
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = {}
+    for name, table in tables.items():
+        path = output_dir / f"{name}{FORMATS[fmt]}"
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            pq.write_table(table, path, row_group_size=64 * 1024, compression="zstd")
+        else:
+            import pyarrow.feather as feather
+
+            # Uncompressed IPC so readers can memory-map it
+            feather.write_feather(table, path, compression="uncompressed")
+        paths[name] = path
+    return paths
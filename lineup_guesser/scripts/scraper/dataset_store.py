@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+SQLite store for the transformed dataset (matches, lineups, players, appearances).
+
+The store is the system of record: the pipeline upserts into it transactionally
+and matches.json is an export from it. Single matches, seasons or players can
+be fixed with an indexed update instead of rewriting the whole JSON file.
+
+Hand edits outlive rebuilds: deleted match IDs are kept as tombstones that the
+pipeline and watch skip, and rows imported with `--source manual` are never
+overwritten by them. Importing a deleted match again, or `undelete`, lifts
+its tombstone.
+
+Usage:
+    python dataset_store.py import ../../src/data/matches.json
+    python dataset_store.py import --source manual fixed_match.json
+    python dataset_store.py export [--output ../../src/data/matches.json]
+    python dataset_store.py stats
+    python dataset_store.py delete-season 2005/06
+    python dataset_store.py delete-match 12345
+    python dataset_store.py delete-before 2010-01-01
+    python dataset_store.py undelete 12345
+    python dataset_store.py reprocess [--player "Thiago Alcântara"]
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+
+DEFAULT_STORE_PATH = Path(__file__).parent / "dataset.sqlite"
+DEFAULT_OUTPUT = Path(__file__).parent / "../../src/data/matches.json"
+
+SIDES = ("home", "away")
+# Sources that rebuild their rows on their own; they never resurrect deleted
+# matches or overwrite rows fixed by hand (MANUAL_SOURCE)
+AUTOMATED_SOURCES = ("pipeline", "watch")
+IMPORT_SOURCE = "import"
+MANUAL_SOURCE = "manual"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    id           TEXT PRIMARY KEY,
+    date         TEXT NOT NULL,
+    season       TEXT NOT NULL,
+    home_team    TEXT NOT NULL,
+    away_team    TEXT NOT NULL,
+    score        TEXT NOT NULL,
+    source       TEXT NOT NULL DEFAULT 'manual',
+    content_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lineups (
+    match_id  TEXT NOT NULL REFERENCES matches (id) ON DELETE CASCADE,
+    side      TEXT NOT NULL,
+    formation TEXT NOT NULL,
+    PRIMARY KEY (match_id, side)
+);
+CREATE TABLE IF NOT EXISTS players (
+    id                   INTEGER PRIMARY KEY,
+    name                 TEXT NOT NULL,
+    nationality          TEXT NOT NULL,
+    last_name            TEXT NOT NULL,
+    last_name_normalized TEXT NOT NULL,
+    alternate_names      TEXT,
+    nationality_flag     TEXT NOT NULL,
+    UNIQUE (name, nationality)
+);
+CREATE TABLE IF NOT EXISTS appearances (
+    match_id     TEXT NOT NULL REFERENCES matches (id) ON DELETE CASCADE,
+    side         TEXT NOT NULL,
+    slot         INTEGER NOT NULL,
+    player_id    INTEGER NOT NULL REFERENCES players (id),
+    age          INTEGER NOT NULL,
+    shirt_number INTEGER NOT NULL,
+    position     TEXT NOT NULL,
+    PRIMARY KEY (match_id, side, slot)
+);
+CREATE TABLE IF NOT EXISTS deleted_matches (
+    id         TEXT PRIMARY KEY,
+    deleted_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_matches_season ON matches (season);
+CREATE INDEX IF NOT EXISTS idx_matches_date ON matches (date);
+CREATE INDEX IF NOT EXISTS idx_matches_home ON matches (home_team);
+CREATE INDEX IF NOT EXISTS idx_matches_away ON matches (away_team);
+CREATE INDEX IF NOT EXISTS idx_matches_source ON matches (source);
+CREATE INDEX IF NOT EXISTS idx_appearances_player ON appearances (player_id);
+CREATE INDEX IF NOT EXISTS idx_players_last_name ON players (last_name_normalized);
+"""
+
+
+def match_hash(match: dict) -> str:
+    return hashlib.sha256(json.dumps(match, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class DatasetStore:
+    """Transactional access to the dataset database."""
+
+    def __init__(self, path: Path = DEFAULT_STORE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    # -- writes --------------------------------------------------------------
+
+    def _player_id(self, player: dict) -> int:
+        alternates = player.get("alternateNames")
+        row = (
+            player["lastName"],
+            player["lastNameNormalized"],
+            json.dumps(alternates, ensure_ascii=False) if alternates else None,
+            player["nationalityFlag"],
+            player["name"],
+            player["nationality"],
+        )
+        self.conn.execute(
+            "INSERT INTO players (last_name, last_name_normalized, alternate_names, nationality_flag, name, nationality) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (name, nationality) DO UPDATE SET last_name = excluded.last_name, "
+            "last_name_normalized = excluded.last_name_normalized, "
+            "alternate_names = excluded.alternate_names, nationality_flag = excluded.nationality_flag",
+            row,
+        )
+        return self.conn.execute(
+            "SELECT id FROM players WHERE name = ? AND nationality = ?",
+            (player["name"], player["nationality"]),
+        ).fetchone()[0]
+
+    def _write_match(self, match: dict, source: str, content_hash: str):
+        self.conn.execute("DELETE FROM matches WHERE id = ?", (match["id"],))
+        self.conn.execute(
+            "INSERT INTO matches (id, date, season, home_team, away_team, score, source, content_hash) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                match["id"], match["date"], match["season"], match["homeTeam"],
+                match["awayTeam"], match["score"], source, content_hash,
+            ),
+        )
+        for side in SIDES:
+            lineup = match[f"{side}Lineup"]
+            self.conn.execute(
+                "INSERT INTO lineups (match_id, side, formation) VALUES (?, ?, ?)",
+                (match["id"], side, lineup["formation"]),
+            )
+            for slot, player in enumerate(lineup["players"]):
+                self.conn.execute(
+                    "INSERT INTO appearances (match_id, side, slot, player_id, age, shirt_number, position) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        match["id"], side, slot, self._player_id(player),
+                        player["age"], player["shirtNumber"], player["position"],
+                    ),
+                )
+
+    def _upsert(self, matches: list[dict], source: str) -> int:
+        changed = 0
+        existing = {
+            row["id"]: (row["content_hash"], row["source"])
+            for row in self.conn.execute("SELECT id, content_hash, source FROM matches")
+        }
+        deleted = self.deleted_ids()
+        for match in matches:
+            content_hash = match_hash(match)
+            old_hash, old_source = existing.get(match["id"], (None, None))
+            if old_hash == content_hash or match["id"] in deleted:
+                continue
+            # Rows fixed by hand win over automated sources
+            if old_source == MANUAL_SOURCE and source != MANUAL_SOURCE:
+                continue
+            self._write_match(match, source, content_hash)
+            changed += 1
+        return changed
+
+    def upsert_matches(self, matches: list[dict], source: str = IMPORT_SOURCE) -> int:
+        """
+        Insert or replace matches in one transaction. Returns how many actually changed.
+        An import brings deleted matches back; automated sources skip them.
+        """
+        with self.conn:
+            if source not in AUTOMATED_SOURCES:
+                self._undelete([m["id"] for m in matches])
+            return self._upsert(matches, source)
+
+    def sync_source(self, matches: list[dict], source: str, check=None) -> tuple[int, int]:
+        """
+        Make the store's matches from `source` equal to `matches`: upsert them and
+        delete any match that source contributed before but no longer produces.
+        Deleted and hand-edited matches are left alone. If given, check(exported matches) runs before commit; when it returns
+        False the sync is rolled back and ValueError raised.
+        Returns (changed, removed).
+        """
+        with self.conn:
+            changed = self._upsert(matches, source)
+            keep = {m["id"] for m in matches}
+            stale = [
+                row["id"]
+                for row in self.conn.execute("SELECT id FROM matches WHERE source = ?", (source,))
+                if row["id"] not in keep
+            ]
+            for match_id in stale:
+                self.conn.execute("DELETE FROM matches WHERE id = ?", (match_id,))
+            if check is not None and not check(self.export_matches()):
+                raise ValueError(f"export after syncing {source!r} failed the check, rolled back")
+        return changed, len(stale)
+
+    def _delete(self, where: str, params: tuple) -> int:
+        with self.conn:
+            # Tombstones keep the next build or watch poll from adding the matches back
+            self.conn.execute(
+                f"INSERT OR IGNORE INTO deleted_matches (id) SELECT id FROM matches WHERE {where}", params
+            )
+            count = self.conn.execute(f"DELETE FROM matches WHERE {where}", params).rowcount
+            self.conn.execute("DELETE FROM players WHERE id NOT IN (SELECT player_id FROM appearances)")
+        return count
+
+    def _undelete(self, match_ids: list[str]) -> int:
+        return self.conn.executemany("DELETE FROM deleted_matches WHERE id = ?", [(i,) for i in match_ids]).rowcount
+
+    def undelete(self, match_id: str) -> int:
+        """Lift a match's tombstone so the next build or watch poll may add it again."""
+        with self.conn:
+            return self._undelete([match_id])
+
+    def delete_match(self, match_id: str) -> int:
+        return self._delete("id = ?", (match_id,))
+
+    def delete_season(self, season: str) -> int:
+        return self._delete("season = ?", (season,))
+
+    def delete_before(self, date: str) -> int:
+        return self._delete("date < ?", (date,))
+
+    def reprocess_players(self, name: str | None = None) -> list[tuple[str, str, str]]:
+        """
+        Re-apply extract_last_name to players (all, or those whose name contains `name`).
+        Returns (name, old lastName, new lastName) for each changed player.
+        """
+        from normalize import normalize_name, extract_last_name
+
+        sql = "SELECT id, name, last_name, alternate_names FROM players"
+        params: tuple = ()
+        if name:
+            sql += " WHERE name LIKE ?"
+            params = (f"%{name}%",)
+
+        changes = []
+        with self.conn:
+            for row in self.conn.execute(sql, params).fetchall():
+                last_name, alternate_names = extract_last_name(row["name"])
+                alternates = json.dumps(alternate_names, ensure_ascii=False) if alternate_names else None
+                if last_name == row["last_name"] and alternates == row["alternate_names"]:
+                    continue
+                self.conn.execute(
+                    "UPDATE players SET last_name = ?, last_name_normalized = ?, alternate_names = ? WHERE id = ?",
+                    (last_name, normalize_name(last_name), alternates, row["id"]),
+                )
+                changes.append((row["name"], row["last_name"], last_name))
+            if changes:
+                self._refresh_hashes(
+                    "SELECT DISTINCT match_id FROM appearances WHERE player_id IN "
+                    "(SELECT id FROM players WHERE name LIKE ?)" if name else "SELECT id FROM matches",
+                    params,
+                )
+        return changes
+
+    def _refresh_hashes(self, id_query: str, params: tuple):
+        """Recompute content hashes for matches whose players were edited in place."""
+        ids = [row[0] for row in self.conn.execute(id_query, params).fetchall()]
+        for match in self.export_matches(ids):
+            self.conn.execute(
+                "UPDATE matches SET content_hash = ? WHERE id = ?", (match_hash(match), match["id"])
+            )
+
+    # -- reads ---------------------------------------------------------------
+
+    def export_matches(self, ids: list[str] | None = None) -> list[dict]:
+        """Matches in the matches.json schema, ordered by date then ID."""
+        where = ""
+        params: list = []
+        if ids is not None:
+            if not ids:
+                return []
+            where = f"WHERE id IN ({', '.join('?' for _ in ids)})"
+            params = list(ids)
+
+        matches: dict[str, dict] = {}
+        for row in self.conn.execute(f"SELECT * FROM matches {where} ORDER BY date, id", params):
+            matches[row["id"]] = {
+                "id": row["id"],
+                "date": row["date"],
+                "season": row["season"],
+                "homeTeam": row["home_team"],
+                "awayTeam": row["away_team"],
+                "score": row["score"],
+            }
+
+        lineup_where = where.replace("id IN", "match_id IN")
+        for row in self.conn.execute(f"SELECT * FROM lineups {lineup_where} ORDER BY side DESC", params):
+            # side DESC puts "home" before "away"
+            matches[row["match_id"]][f"{row['side']}Lineup"] = {"formation": row["formation"], "players": []}
+
+        appearance_where = where.replace("id IN", "a.match_id IN")
+        for row in self.conn.execute(
+            "SELECT a.match_id, a.side, a.age, a.shirt_number, a.position, p.name, p.last_name, "
+            "p.last_name_normalized, p.nationality, p.nationality_flag, p.alternate_names "
+            f"FROM appearances a JOIN players p ON p.id = a.player_id {appearance_where} "
+            "ORDER BY a.match_id, a.side, a.slot",
+            params,
+        ):
+            player = {
+                "name": row["name"],
+                "lastName": row["last_name"],
+                "lastNameNormalized": row["last_name_normalized"],
+                "nationality": row["nationality"],
+                "nationalityFlag": row["nationality_flag"],
+                "age": row["age"],
+                "shirtNumber": row["shirt_number"],
+                "position": row["position"],
+            }
+            if row["alternate_names"]:
+                player["alternateNames"] = json.loads(row["alternate_names"])
+            matches[row["match_id"]][f"{row['side']}Lineup"]["players"].append(player)
+
+        return list(matches.values())
+
+    def match_ids(self) -> set[str]:
+        return {row[0] for row in self.conn.execute("SELECT id FROM matches")}
+
+    def deleted_ids(self) -> set[str]:
+        return {row[0] for row in self.conn.execute("SELECT id FROM deleted_matches")}
+
+    def stats(self) -> list[dict]:
+        sql = """
+            SELECT season, COUNT(*) AS matches, MIN(date) AS first, MAX(date) AS last
+            FROM matches GROUP BY season ORDER BY season
+        """
+        return [dict(r) for r in self.conn.execute(sql)]
+
+    def export_json(self, output_path: Path) -> tuple[int, bool]:
+        """Write matches.json from the store. Returns (match count, whether the file changed)."""
+        from transform import write_matches
+
+        matches = self.export_matches()
+        return len(matches), write_matches(matches, output_path)
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Manage the SQLite dataset store")
+    parser.add_argument("--store", type=Path, default=DEFAULT_STORE_PATH, help="Store database path")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    imp = sub.add_parser("import", help="Load a matches.json into the store")
+    imp.add_argument("path", type=Path, nargs="?", default=DEFAULT_OUTPUT)
+    imp.add_argument("--source", choices=[IMPORT_SOURCE, MANUAL_SOURCE], default=IMPORT_SOURCE,
+                     help="'manual' marks hand-fixed rows that build and watch never overwrite")
+    exp = sub.add_parser("export", help="Write matches.json from the store")
+    exp.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    sub.add_parser("stats", help="Matches per season")
+    ds = sub.add_parser("delete-season", help="Delete every match of a season")
+    ds.add_argument("season")
+    dm = sub.add_parser("delete-match", help="Delete one match")
+    dm.add_argument("match_id")
+    db = sub.add_parser("delete-before", help="Delete matches before a date (YYYY-MM-DD)")
+    db.add_argument("date")
+    ud = sub.add_parser("undelete", help="Let a deleted match be added again by the next build")
+    ud.add_argument("match_id")
+    rp = sub.add_parser("reprocess", help="Re-apply last name extraction to players")
+    rp.add_argument("--player", help="Only players whose name contains this")
+    args = parser.parse_args(argv)
+
+    store = DatasetStore(args.store)
+
+    if args.command == "import":
+        with open(args.path, encoding="utf-8") as f:
+            matches = json.load(f)
+        changed = store.upsert_matches(matches, args.source)
+        print(f"Imported {len(matches)} matches ({changed} new or changed)")
+    elif args.command == "export":
+        count, changed = store.export_json(args.output)
+        print(f"Wrote {count} matches to {args.output}" if changed else f"{args.output} unchanged")
+    elif args.command == "stats":
+        for row in store.stats():
+            print(f"{row['season']:<10} {row['matches']:>6}  {row['first']} → {row['last']}")
+    elif args.command == "delete-season":
+        print(f"Deleted {store.delete_season(args.season)} matches")
+    elif args.command == "delete-match":
+        print(f"Deleted {store.delete_match(args.match_id)} matches")
+    elif args.command == "delete-before":
+        print(f"Deleted {store.delete_before(args.date)} matches")
+    elif args.command == "undelete":
+        print(f"Lifted {store.undelete(args.match_id)} tombstones")
+    elif args.command == "reprocess":
+        changes = store.reprocess_players(args.player)
+        for name, old, new in changes:
+            print(f"  {name}: {old!r} → {new!r}")
+        print(f"Updated {len(changes)} player last names")
+
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Compact deltas between published versions of matches.json.
+
+A delta lists removed match IDs, added matches and, for changed matches, only
+the fields that changed (down to individual player fields). Each published
+version is the hash of its canonical serialization, and versions.json records
+the chain base → version so consumers can update incrementally.
+
+Usage:
+    python delta.py diff old.json new.json -o delta.json
+    python delta.py apply old.json delta.json -o new.json
+    python delta.py verify old.json delta.json new.json
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import logging
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from transform import serialize_matches
+
+logger = logging.getLogger(__name__)
+
+DELTA_FORMAT = 1
+LINEUP_SIDES = ("homeLineup", "awayLineup")
+DEFAULT_RELEASES_DIR = Path(__file__).parent / "../../public/data/releases"
+
+
+def dataset_version(matches: list[dict]) -> str:
+    """Version ID of a dataset: hash of exactly the bytes written to matches.json."""
+    return hashlib.sha256(serialize_matches(matches).encode("utf-8")).hexdigest()[:16]
+
+
+def _same(a, b) -> bool:
+    """Equality that also respects key order, since output must match byte for byte."""
+    return json.dumps(a, ensure_ascii=False) == json.dumps(b, ensure_ascii=False)
+
+
+def _dict_patch(old: dict, new: dict) -> dict:
+    patch: dict = {}
+    changed = {k: v for k, v in new.items() if k not in old or not _same(old[k], v)}
+    removed = [k for k in old if k not in new]
+    if changed:
+        patch["set"] = changed
+    if removed:
+        patch["unset"] = removed
+    return patch
+
+
+def _apply_dict_patch(target: dict, patch: dict):
+    for key in patch.get("unset", []):
+        target.pop(key, None)
+    for key, value in patch.get("set", {}).items():
+        target[key] = value
+
+
+def diff_match(old: dict, new: dict) -> dict:
+    """Field-level patch turning old into new, or a full replacement if that is not possible."""
+    patch: dict = {"id": new["id"]}
+    top_old = {k: v for k, v in old.items() if k not in LINEUP_SIDES}
+    top_new = {k: v for k, v in new.items() if k not in LINEUP_SIDES}
+    patch.update(_dict_patch(top_old, top_new))
+
+    players: dict = {}
+    for side in LINEUP_SIDES:
+        old_lineup, new_lineup = old.get(side), new.get(side)
+        if _same(old_lineup, new_lineup):
+            continue
+        if (
+            not old_lineup
+            or not new_lineup
+            or old_lineup.get("formation") != new_lineup.get("formation")
+            or len(old_lineup.get("players", [])) != len(new_lineup.get("players", []))
+        ):
+            patch.setdefault("set", {})[side] = new_lineup
+            continue
+        side_patch = {}
+        for i, (p_old, p_new) in enumerate(zip(old_lineup["players"], new_lineup["players"])):
+            if not _same(p_old, p_new):
+                side_patch[str(i)] = _dict_patch(p_old, p_new)
+        players[side] = side_patch
+    if players:
+        patch["players"] = players
+
+    # Key order matters for byte-identical output; fall back to replacing the match
+    if not _same(apply_match_patch(copy.deepcopy(old), patch), new):
+        return {"id": new["id"], "replace": new}
+    return patch
+
+
+def apply_match_patch(match: dict, patch: dict) -> dict:
+    if "replace" in patch:
+        return copy.deepcopy(patch["replace"])
+    _apply_dict_patch(match, patch)
+    for side, side_patch in patch.get("players", {}).items():
+        for index, player_patch in side_patch.items():
+            _apply_dict_patch(match[side]["players"][int(index)], player_patch)
+    return match
+
+
+def make_delta(base: list[dict], new: list[dict]) -> dict:
+    """Delta from base to new, keyed by match ID."""
+    base_by_id = {m["id"]: m for m in base}
+    new_ids = {m["id"] for m in new}
+
+    delta: dict = {
+        "format": DELTA_FORMAT,
+        "base": dataset_version(base),
+        "version": dataset_version(new),
+        "removed": [m["id"] for m in base if m["id"] not in new_ids],
+        "added": [m for m in new if m["id"] not in base_by_id],
+        "changed": [
+            diff_match(base_by_id[m["id"]], m)
+            for m in new
+            if m["id"] in base_by_id and not _same(base_by_id[m["id"]], m)
+        ],
+    }
+
+    # Only ship an explicit order if "base order, then added" is not already right
+    if [m["id"] for m in _apply_without_order(base, delta)] != [m["id"] for m in new]:
+        delta["order"] = [m["id"] for m in new]
+    return delta
+
+
+def _apply_without_order(base: list[dict], delta: dict) -> list[dict]:
+    removed = set(delta["removed"])
+    changes = {c["id"]: c for c in delta["changed"]}
+    result = []
+    for match in base:
+        if match["id"] in removed:
+            continue
+        if match["id"] in changes:
+            match = apply_match_patch(copy.deepcopy(match), changes[match["id"]])
+        result.append(match)
+    result.extend(copy.deepcopy(delta["added"]))
+    return result
+
+
+def apply_delta(base: list[dict], delta: dict) -> list[dict]:
+    """Apply a delta to its base dataset. Raises ValueError on a version mismatch."""
+    if delta.get("format") != DELTA_FORMAT:
+        raise ValueError(f"Unsupported delta format {delta.get('format')}")
+    if dataset_version(base) != delta["base"]:
+        raise ValueError(f"Delta expects base {delta['base']}, got {dataset_version(base)}")
+
+    result = _apply_without_order(base, delta)
+    if "order" in delta:
+        by_id = {m["id"]: m for m in result}
+        result = [by_id[mid] for mid in delta["order"]]
+    return result
+
+
+def verify_delta(base: list[dict], delta: dict, new_bytes: bytes) -> bool:
+    """True if base + delta serializes to exactly new_bytes (the new file's content)."""
+    rebuilt = apply_delta(base, delta)
+    return (
+        serialize_matches(rebuilt).encode("utf-8") == new_bytes
+        and dataset_version(rebuilt) == delta["version"]
+    )
+
+
+def publish_delta(base: list[dict] | None, new: list[dict], releases_dir: Path) -> dict | None:
+    """
+    Record new as the latest version in releases_dir/versions.json, writing the
+    delta from base alongside it. If base is not the recorded latest version (the
+    file was overwritten outside the chain), new is recorded as a full version
+    instead, since no consumer can hold that base. Returns the delta, or None if
+    nothing changed or no delta was written.
+    """
+    versions_file = releases_dir / "versions.json"
+    chain = {"latest": None, "versions": []}
+    if versions_file.exists():
+        chain = json.loads(versions_file.read_text(encoding="utf-8"))
+
+    version = dataset_version(new)
+    if chain["latest"] == version:
+        return None
+
+    entry = {
+        "version": version,
+        "base": None,
+        "delta": None,
+        "matches": len(new),
+        "published": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+    }
+    delta = None
+    base_version = dataset_version(base) if base is not None else None
+    if base_version is not None and chain["latest"] is not None and base_version != chain["latest"]:
+        logger.warning(
+            f"Published file is version {base_version} but the chain's latest is {chain['latest']}; "
+            f"recording {version} as a full version"
+        )
+    elif base_version is not None and base_version != version:
+        delta = make_delta(base, new)
+        if not verify_delta(base, delta, serialize_matches(new).encode("utf-8")):
+            raise ValueError(f"Delta {delta['base']} → {version} does not reproduce the new dataset")
+        delta_name = f"deltas/{delta['base']}_{version}.json"
+        delta_path = releases_dir / delta_name
+        delta_path.parent.mkdir(parents=True, exist_ok=True)
+        delta_path.write_text(json.dumps(delta, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        entry.update(
+            base=delta["base"],
+            delta=delta_name,
+            added=len(delta["added"]),
+            removed=len(delta["removed"]),
+            changed=len(delta["changed"]),
+        )
+
+    chain["latest"] = version
+    chain["versions"].append(entry)
+    releases_dir.mkdir(parents=True, exist_ok=True)
+    versions_file.write_text(json.dumps(chain, indent=2), encoding="utf-8")
+    return delta
+
+
+def _load(path: Path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Diff, apply and verify matches.json deltas")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    d = sub.add_parser("diff", help="Write the delta from OLD to NEW")
+    d.add_argument("old", type=Path)
+    d.add_argument("new", type=Path)
+    d.add_argument("-o", "--output", type=Path, required=True)
+
+    a = sub.add_parser("apply", help="Apply DELTA to BASE")
+    a.add_argument("base", type=Path)
+    a.add_argument("delta", type=Path)
+    a.add_argument("-o", "--output", type=Path, required=True)
+
+    v = sub.add_parser("verify", help="Check BASE + DELTA reproduces NEW bit-for-bit")
+    v.add_argument("base", type=Path)
+    v.add_argument("delta", type=Path)
+    v.add_argument("new", type=Path)
+    args = parser.parse_args(argv)
+
+    if args.command == "diff":
+        delta = make_delta(_load(args.old), _load(args.new))
+        args.output.write_text(json.dumps(delta, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        print(
+            f"{delta['base']} → {delta['version']}: {len(delta['added'])} added, "
+            f"{len(delta['removed'])} removed, {len(delta['changed'])} changed"
+        )
+    elif args.command == "apply":
+        result = apply_delta(_load(args.base), _load(args.delta))
+        args.output.write_text(serialize_matches(result), encoding="utf-8")
+        print(f"Wrote {len(result)} matches ({dataset_version(result)}) to {args.output}")
+    else:
+        if verify_delta(_load(args.base), _load(args.delta), args.new.read_bytes()):
+            print("OK: base + delta reproduces the new dataset")
+        else:
+            print("MISMATCH: base + delta does not reproduce the new dataset")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
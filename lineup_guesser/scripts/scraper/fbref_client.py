@@ -4,69 +4,224 @@ import json
 import time
 import logging
 import hashlib
+import sqlite3
+import threading
 from pathlib import Path
 
-import requests
+from cache_files import DEFAULT_CACHE_DIR, read_cache_file, write_cache_file
+from fixture_index import FixtureIndex
+from host_lock import SharedRateLimiter, request_lock
 
 logger = logging.getLogger(__name__)
 
 API_BASE = "https://footballapi.pulselive.com/football"
 REQUEST_DELAY = 0.5  # seconds between requests (API is generous but be polite)
 
+# The only parts of a fixture detail parse_match, the fixture index, watch and cache_tool read
+DETAIL_FIELDS = ("id", "status", "kickoff", "teams", "teamLists", "compSeason")
+# Set on cached stream-parsed details, so a client that wants the full payload refetches them
+PARTIAL_MARKER = "_partial"
+
+try:
+    import brotli  # noqa: F401  (lets urllib3 decode "br")
+
+    ACCEPT_ENCODING = "br, gzip, deflate"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+
+def cache_key(url: str, params: dict | None = None) -> str:
+    """Cache key for a request: md5 of the URL plus its sorted params."""
+    key = url + (json.dumps(params, sort_keys=True) if params else "")
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+def match_detail_url(fixture_id: int) -> str:
+    return f"{API_BASE}/fixtures/{fixture_id}"
+
+
+def endpoint_name(url: str) -> str:
+    """Coarse endpoint label used for transfer statistics."""
+    path = url.removeprefix(API_BASE)
+    if path.startswith("/fixtures/"):
+        return "fixture_detail"
+    if path.startswith("/fixtures"):
+        return "fixtures"
+    if path.endswith("/compseasons"):
+        return "seasons"
+    return path
+
+
+def stream_fields(fp, fields: tuple[str, ...]) -> dict:
+    """
+    Incrementally parse a JSON object from fp, materializing only the given
+    top-level keys. Requires ijson; everything else is skipped as it streams past.
+    """
+    import ijson
+
+    result = {}
+    builder = None
+    current = None
+    for prefix, event, value in ijson.parse(fp, use_float=True):
+        if prefix == "" and event == "map_key":
+            current = value if value in fields else None
+            builder = ijson.ObjectBuilder() if current else None
+            continue
+        if builder is None:
+            continue
+        builder.event(event, value)
+        # The value is complete once we see a scalar or the closing event at its own prefix
+        if prefix == current and event not in ("start_map", "start_array", "map_key"):
+            result[current] = builder.value
+            builder = None
+            if len(result) == len(fields):
+                break
+    return result
+
 
 class PLClient:
     """HTTP client for the PulseLive PL API."""
 
-    def __init__(self, cache_dir: Path | None = None):
+    def __init__(self, cache_dir: Path | None = None, stream_details: bool = False):
+        """
+        With stream_details, fixture details are stream-parsed and only
+        DETAIL_FIELDS are kept, which needs ijson installed. They are cached
+        marked as partial; clients without stream_details refetch and replace them.
+        """
+        # Imported here: most users of this module only need cache_key and friends
+        import requests
+
         self.session = requests.Session()
         self.session.headers.update(
             {
                 "Origin": "https://www.premierleague.com",
                 "Referer": "https://www.premierleague.com/",
+                "Accept-Encoding": ACCEPT_ENCODING,
             }
         )
-        self.last_request_time = 0.0
-        self.cache_dir = cache_dir or Path(__file__).parent / ".cache"
+        self.stream_details = stream_details
+        if stream_details:
+            try:
+                import ijson  # noqa: F401
+            except ImportError:
+                logger.warning("ijson is not installed, fixture details will be decoded in full")
+                self.stream_details = False
+        # endpoint → {"requests", "wire_bytes", "decoded_bytes"}
+        self.transfer_stats: dict[str, dict[str, int]] = {}
+        # Pacing is shared with every other PLClient on this host, in any process
+        self.limiter = SharedRateLimiter(REQUEST_DELAY)
+        self._stats_lock = threading.Lock()
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
         self.cache_dir.mkdir(exist_ok=True)
-
-    def _rate_limit(self):
-        elapsed = time.time() - self.last_request_time
-        if elapsed < REQUEST_DELAY:
-            time.sleep(REQUEST_DELAY - elapsed)
+        self.index = FixtureIndex(self.cache_dir / "index.sqlite")
 
     def _cache_path(self, url: str, params: dict | None = None) -> Path:
-        key = url + (json.dumps(params, sort_keys=True) if params else "")
-        url_hash = hashlib.md5(key.encode()).hexdigest()
-        return self.cache_dir / f"{url_hash}.json"
+        return self.cache_dir / f"{cache_key(url, params)}.json"
 
-    def get_json(self, url: str, params: dict | None = None, use_cache: bool = True) -> dict:
+    def _read_cached(self, cache_file: Path):
+        """The cached payload, or None if it is a trimmed detail and this client wants full ones."""
+        data = read_cache_file(cache_file)
+        if not self.stream_details and isinstance(data, dict) and data.get(PARTIAL_MARKER):
+            return None
+        return data
+
+    def get_json(
+        self,
+        url: str,
+        params: dict | None = None,
+        use_cache: bool = True,
+        refresh: bool = False,
+    ) -> dict:
+        """
+        GET a JSON endpoint. With use_cache, responses are read from and written to
+        the cache; refresh skips the cached copy but still writes the new response.
+        """
         cache_file = self._cache_path(url, params)
 
-        if use_cache and cache_file.exists():
-            return json.loads(cache_file.read_text(encoding="utf-8"))
+        if use_cache and not refresh and cache_file.exists():
+            try:
+                data = self._read_cached(cache_file)
+                if data is not None:
+                    return data
+            except ValueError as e:
+                # A truncated or corrupt entry is refetched instead of failing the caller
+                logger.warning(f"Unreadable cache entry {cache_file.name} for {url}, refetching: {e}")
+            refresh = True
 
-        self._rate_limit()
-        logger.debug(f"Fetching: {url}")
+        if not use_cache:
+            return self._fetch(url, params)
+
+        started = time.time()
+        with request_lock(self.cache_dir / ".locks", cache_file.stem):
+            # Another process (or thread) may have fetched it while we waited for the lock
+            if cache_file.exists() and (not refresh or cache_file.stat().st_mtime >= started):
+                try:
+                    data = self._read_cached(cache_file)
+                    if data is not None:
+                        return data
+                except ValueError:
+                    pass
 
-        response = self.session.get(url, params=params, timeout=30)
-        response.raise_for_status()
-        self.last_request_time = time.time()
+            data = self._fetch(url, params)
+            write_cache_file(cache_file, data)
+        try:
+            self.index.record(cache_file.stem, data)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not index {url}: {e}")
 
-        data = response.json()
-        if use_cache:
-            cache_file.write_text(json.dumps(data), encoding="utf-8")
+        return data
+
+    def _fetch(self, url: str, params: dict | None) -> dict:
+        self.limiter.acquire()
+        logger.debug(f"Fetching: {url}")
 
+        endpoint = endpoint_name(url)
+        try:
+            with self.session.get(url, params=params, timeout=30, stream=True) as response:
+                response.raise_for_status()
+                if self.stream_details and endpoint == "fixture_detail":
+                    response.raw.decode_content = True
+                    data = stream_fields(response.raw, DETAIL_FIELDS)
+                    data[PARTIAL_MARKER] = True
+                    decoded_bytes = None
+                else:
+                    body = response.content
+                    data = json.loads(body)
+                    decoded_bytes = len(body)
+                wire_bytes = response.raw.tell()
+        finally:
+            self.limiter.release()
+        self._record_transfer(endpoint, wire_bytes, decoded_bytes)
         return data
 
-    def get_seasons(self) -> list[dict]:
+    def _record_transfer(self, endpoint: str, wire_bytes: int, decoded_bytes: int | None):
+        with self._stats_lock:
+            stats = self.transfer_stats.setdefault(
+                endpoint, {"requests": 0, "wire_bytes": 0, "decoded_bytes": 0}
+            )
+            stats["requests"] += 1
+            stats["wire_bytes"] += wire_bytes
+            # Streamed bodies are never decoded in full
+            stats["decoded_bytes"] += decoded_bytes if decoded_bytes is not None else 0
+
+    def log_transfer_stats(self):
+        for endpoint, stats in sorted(self.transfer_stats.items()):
+            decoded = f"{stats['decoded_bytes'] / 1024:.0f} KiB decoded" if stats["decoded_bytes"] else "streamed"
+            logger.info(
+                f"  {endpoint}: {stats['requests']} requests, "
+                f"{stats['wire_bytes'] / 1024:.0f} KiB on the wire, {decoded}"
+            )
+
+    def get_seasons(self, refresh: bool = False) -> list[dict]:
         """Get all PL season IDs."""
         data = self.get_json(
             f"{API_BASE}/competitions/1/compseasons",
             params={"page": "0", "pageSize": "100"},
+            refresh=refresh,
         )
         return data.get("content", [])
 
-    def get_fixtures(self, season_id: int, page: int = 0, page_size: int = 40) -> dict:
+    def get_fixtures(self, season_id: int, page: int = 0, page_size: int = 40, refresh: bool = False) -> dict:
         """Get fixtures for a season (paginated)."""
         return self.get_json(
             f"{API_BASE}/fixtures",
@@ -77,26 +232,30 @@ class PLClient:
                 "page": str(page),
                 "sort": "asc",
             },
+            refresh=refresh,
         )
 
-    def get_all_fixture_ids(self, season_id: int) -> list[int]:
-        """Get all fixture IDs for a season."""
-        fixture_ids = []
+    def get_all_fixtures(self, season_id: int, refresh: bool = False) -> list[dict]:
+        """Get listing metadata (id, status, kickoff, teams) for every fixture in a season."""
+        fixtures = []
         page = 0
         while True:
-            data = self.get_fixtures(season_id, page=page)
+            data = self.get_fixtures(season_id, page=page, refresh=refresh)
             content = data.get("content", [])
             if not content:
                 break
-            for match in content:
-                fixture_ids.append(int(match["id"]))
+            fixtures.extend(content)
             # Check if there are more pages
             page_info = data.get("pageInfo", {})
             if page >= page_info.get("numPages", 1) - 1:
                 break
             page += 1
-        return fixture_ids
+        return fixtures
+
+    def get_all_fixture_ids(self, season_id: int) -> list[int]:
+        """Get all fixture IDs for a season."""
+        return [int(match["id"]) for match in self.get_all_fixtures(season_id)]
 
-    def get_match_detail(self, fixture_id: int) -> dict:
+    def get_match_detail(self, fixture_id: int, refresh: bool = False) -> dict:
         """Get full match detail including lineups."""
-        return self.get_json(f"{API_BASE}/fixtures/{fixture_id}")
+        return self.get_json(match_detail_url(fixture_id), refresh=refresh)
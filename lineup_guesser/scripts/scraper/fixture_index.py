@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Local index of cached fixtures, so the cache can be queried without recomputing hashes.
+
+PLClient.get_json records every payload it writes. Listing pages fill in season,
+teams, date and status; match details add the cache key, lineup/formation presence
+and parse status. `rebuild` re-derives the index from the cache files alone.
+
+Usage:
+    python fixture_index.py rebuild
+    python fixture_index.py stats
+    python fixture_index.py query --season 2015/16 [--team Arsenal] [--has-lineups] [--status ok] [--ids-only]
+"""
+
+import argparse
+import logging
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+from cache_files import iter_entries, read_cache_file
+from parsers import check_match, parse_match_date, team_sides
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = Path(__file__).parent / ".cache" / "index.sqlite"
+
+# Parse status recorded for usable match details; otherwise the parsers.REJECT_* reason
+STATUS_OK = "ok"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fixtures (
+    fixture_id     INTEGER PRIMARY KEY,
+    season_id      INTEGER,
+    season         TEXT,
+    home_team      TEXT,
+    away_team      TEXT,
+    date           TEXT,
+    status         TEXT,
+    listing_key    TEXT,
+    detail_key     TEXT,
+    has_lineups    INTEGER,
+    has_formations INTEGER,
+    parse_status   TEXT,
+    updated_at     REAL
+);
+CREATE INDEX IF NOT EXISTS idx_fixtures_season ON fixtures (season);
+CREATE INDEX IF NOT EXISTS idx_fixtures_season_id ON fixtures (season_id);
+CREATE INDEX IF NOT EXISTS idx_fixtures_home ON fixtures (home_team);
+CREATE INDEX IF NOT EXISTS idx_fixtures_away ON fixtures (away_team);
+"""
+
+COLUMNS = (
+    "fixture_id", "season_id", "season", "home_team", "away_team", "date", "status",
+    "listing_key", "detail_key", "has_lineups", "has_formations", "parse_status", "updated_at",
+)
+
+
+def is_match_detail(data) -> bool:
+    return isinstance(data, dict) and "id" in data and "teams" in data and "kickoff" in data
+
+
+def is_fixture_listing(data) -> bool:
+    content = data.get("content") if isinstance(data, dict) else None
+    return isinstance(content, list) and bool(content) and is_match_detail(content[0])
+
+
+def detail_status(data: dict) -> str:
+    """Classify a match detail the same way the scraper would accept or reject it."""
+    _, reason = check_match(data)
+    return reason or STATUS_OK
+
+
+def fixture_metadata(fixture: dict) -> dict:
+    """Season, teams, date and status shared by listing entries and match details."""
+    comp_season = fixture.get("compSeason") or {}
+    home, away = team_sides(fixture.get("teams") or [])
+    names = [((t or {}).get("team") or {}).get("name") for t in (home, away)]
+    season_id = comp_season.get("id")
+    return {
+        "fixture_id": int(fixture["id"]),
+        "season_id": int(season_id) if season_id is not None else None,
+        "season": comp_season.get("label"),
+        "home_team": names[0],
+        "away_team": names[1],
+        "date": parse_match_date(fixture.get("kickoff") or {}),
+        "status": fixture.get("status"),
+    }
+
+
+def _read_entry(path: Path):
+    try:
+        return read_cache_file(path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Skipping unreadable cache entry {path.name}: {e}")
+        return None
+
+
+class FixtureIndex:
+    """SQLite-backed fixture ID → metadata index. Safe to share between threads."""
+
+    def __init__(self, path: Path = DEFAULT_INDEX_PATH):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def _upsert(self, row: dict):
+        row = {**row, "updated_at": time.time()}
+        columns = [c for c in COLUMNS if c in row]
+        # Only overwrite columns the new payload actually knows about
+        updates = ", ".join(
+            f"{c} = COALESCE(excluded.{c}, {c})" for c in columns if c != "fixture_id"
+        )
+        self.conn.execute(
+            f"INSERT INTO fixtures ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)}) "
+            f"ON CONFLICT(fixture_id) DO UPDATE SET {updates}",
+            [row[c] for c in columns],
+        )
+
+    def record(self, cache_key: str, data) -> int:
+        """Index a payload written under cache_key. Returns the number of fixtures touched."""
+        return self.record_many([(cache_key, data)])
+
+    def record_many(self, payloads) -> int:
+        """Index (cache_key, payload) pairs in one transaction. Listings should come before details."""
+        count = 0
+        with self._lock, self.conn:
+            for cache_key, data in payloads:
+                if is_match_detail(data):
+                    rows = [self._detail_row(cache_key, data)]
+                elif is_fixture_listing(data):
+                    rows = [{**fixture_metadata(f), "listing_key": cache_key} for f in data["content"]]
+                else:
+                    continue
+                for row in rows:
+                    self._upsert(row)
+                count += len(rows)
+        return count
+
+    def _detail_row(self, cache_key: str, data: dict) -> dict:
+        team_lists = data.get("teamLists") or []
+        return {
+            **fixture_metadata(data),
+            "detail_key": cache_key,
+            "has_lineups": int(len(team_lists) >= 2),
+            "has_formations": int(
+                len(team_lists) >= 2
+                and all((tl.get("formation") or {}).get("label") for tl in team_lists)
+            ),
+            "parse_status": detail_status(data),
+        }
+
+    def forget(self, cache_keys) -> int:
+        """Drop references to cache entries that no longer exist. Returns the number of fixtures touched."""
+        keys = list(cache_keys)
+        touched = 0
+        with self._lock, self.conn:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i : i + 500]
+                marks = ", ".join("?" for _ in chunk)
+                touched += self.conn.execute(
+                    f"UPDATE fixtures SET detail_key = NULL, has_lineups = NULL, has_formations = NULL, "
+                    f"parse_status = NULL WHERE detail_key IN ({marks})",
+                    chunk,
+                ).rowcount
+                touched += self.conn.execute(
+                    f"UPDATE fixtures SET listing_key = NULL WHERE listing_key IN ({marks})", chunk
+                ).rowcount
+        return touched
+
+    def get(self, fixture_id: int) -> dict | None:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT * FROM fixtures WHERE fixture_id = ?", (fixture_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def query(
+        self,
+        season: str | int | None = None,
+        team: str | None = None,
+        has_lineups: bool | None = None,
+        has_detail: bool | None = None,
+        parse_status: str | None = None,
+    ) -> list[dict]:
+        """Fixtures matching every given filter, ordered by date."""
+        clauses = []
+        params: list = []
+        if season is not None:
+            if isinstance(season, int) or str(season).isdigit():
+                clauses.append("season_id = ?")
+                params.append(int(season))
+            else:
+                clauses.append("season = ?")
+                params.append(season)
+        if team:
+            clauses.append("(home_team = ? OR away_team = ?)")
+            params += [team, team]
+        if has_lineups is not None:
+            clauses.append("has_lineups = ?")
+            params.append(int(has_lineups))
+        if has_detail is not None:
+            clauses.append("detail_key IS NOT NULL" if has_detail else "detail_key IS NULL")
+        if parse_status:
+            clauses.append("parse_status = ?")
+            params.append(parse_status)
+
+        sql = "SELECT * FROM fixtures"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY date, fixture_id"
+        with self._lock:
+            return [dict(r) for r in self.conn.execute(sql, params)]
+
+    def stats(self) -> list[dict]:
+        """Per-season counts of listed fixtures, cached details and usable matches."""
+        sql = """
+            SELECT season, COUNT(*) AS fixtures,
+                   SUM(detail_key IS NOT NULL) AS details,
+                   SUM(parse_status = 'ok') AS usable
+            FROM fixtures GROUP BY season_id, season ORDER BY season_id
+        """
+        with self._lock:
+            return [dict(r) for r in self.conn.execute(sql)]
+
+    def rebuild(self, cache_dir: Path) -> int:
+        """Re-derive the index from every cached payload in cache_dir."""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM fixtures")
+        detail_paths: list[Path] = []
+
+        def listings():
+            for path in sorted(iter_entries(cache_dir)):
+                data = _read_entry(path)
+                if is_match_detail(data):
+                    detail_paths.append(path)
+                elif data is not None:
+                    yield path.stem, data
+
+        def details():
+            for path in detail_paths:
+                data = _read_entry(path)
+                if data is not None:
+                    yield path.stem, data
+
+        # Two streaming passes, listings first so details can fill in on top of them.
+        # Only one payload is held at a time; details are re-read rather than kept.
+        return self.record_many(listings()) + self.record_many(details())
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Query the local fixture cache index")
+    parser.add_argument("--index", type=Path, default=DEFAULT_INDEX_PATH, help="Index database path")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("rebuild", help="Rebuild the index from the cache directory it sits in")
+    sub.add_parser("stats", help="Per-season counts")
+
+    q = sub.add_parser("query", help="List indexed fixtures")
+    q.add_argument("--season", help="Season label (2015/16) or season ID")
+    q.add_argument("--team", help="Team name (home or away)")
+    q.add_argument("--has-lineups", action="store_true", default=None, help="Only fixtures with lineups")
+    q.add_argument("--missing-detail", action="store_true", help="Only fixtures without a cached detail")
+    q.add_argument("--status", help="Parse status (ok or a rejection reason such as missing_formation)")
+    q.add_argument("--ids-only", action="store_true", help="Print fixture IDs only")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    index = FixtureIndex(args.index)
+
+    if args.command == "rebuild":
+        count = index.rebuild(args.index.parent)
+        print(f"Indexed {count} fixture records")
+    elif args.command == "stats":
+        print(f"{'Season':<10} {'Fixtures':>8} {'Details':>8} {'Usable':>8}")
+        for row in index.stats():
+            print(f"{row['season'] or '?':<10} {row['fixtures']:>8} {row['details'] or 0:>8} {row['usable'] or 0:>8}")
+    else:
+        rows = index.query(
+            season=args.season,
+            team=args.team,
+            has_lineups=args.has_lineups,
+            has_detail=False if args.missing_detail else None,
+            parse_status=args.status,
+        )
+        for row in rows:
+            if args.ids_only:
+                print(row["fixture_id"])
+            else:
+                print(
+                    f"{row['fixture_id']:>8}  {row['date'] or '?':<10}  {row['season'] or '?':<8}  "
+                    f"{row['home_team']} v {row['away_team']}  "
+                    f"[{row['parse_status'] or 'not fetched'}]"
+                )
+        if not args.ids_only:
+            print(f"{len(rows)} fixtures", file=sys.stderr)
+
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Build-time inverted indexes and per-match difficulty features.
+
+Written to public/data/, next to the delta releases, so the built site can
+fetch them on demand (`${import.meta.env.BASE_URL}data/players.json`) instead
+of bundling them or scanning the dataset:
+
+- players.json      "name|nationality" → [[team, season, position, appearances], ...]
+- rosters.json      "team|season" → sorted "name|nationality" keys
+- match_hints.json  match ID → per side: difficulty features and, per lineup
+                    slot, the other clubs that player appears for in the dataset
+
+Players are identified by (name, nationality), as in the dataset store, so
+namesakes are not merged.
+"""
+
+import json
+from collections import Counter, defaultdict
+from pathlib import Path
+
+HINT_FILES = ("players", "rosters", "match_hints")
+DEFAULT_HINTS_DIR = Path(__file__).parent / "../../public/data"
+SIDES = (("home", "homeTeam", "homeLineup"), ("away", "awayTeam", "awayLineup"))
+
+# A nationality is "rare" if it accounts for less than this share of all appearances
+RARE_NATIONALITY_SHARE = 0.01
+
+
+def player_key(player: dict) -> str:
+    return f"{player['name']}|{player['nationality']}"
+
+
+def _appearances(matches: list[dict]):
+    for match in matches:
+        for side, team_key, lineup_key in SIDES:
+            for slot, player in enumerate(match[lineup_key]["players"]):
+                yield match, side, match[team_key], slot, player
+
+
+def build_indexes(matches: list[dict]) -> dict[str, dict]:
+    """Return {file stem: content} for every side file."""
+    player_spells: dict[str, Counter] = defaultdict(Counter)
+    rosters: dict[str, set] = defaultdict(set)
+    player_counts: Counter = Counter()
+    nationality_counts: Counter = Counter()
+
+    for match, _, team, _, player in _appearances(matches):
+        key = player_key(player)
+        player_spells[key][(team, match["season"], player["position"])] += 1
+        rosters[f"{team}|{match['season']}"].add(key)
+        player_counts[key] += 1
+        nationality_counts[player["nationality"]] += 1
+
+    total = sum(nationality_counts.values()) or 1
+    rare = {nat for nat, count in nationality_counts.items() if count / total < RARE_NATIONALITY_SHARE}
+
+    player_teams = {
+        key: sorted({team for team, _, _ in spells}) for key, spells in player_spells.items()
+    }
+
+    hints: dict[str, dict] = {}
+    for match in matches:
+        entry = {}
+        for side, team_key, lineup_key in SIDES:
+            players = match[lineup_key]["players"]
+            team = match[team_key]
+            count = len(players) or 1
+            entry[side] = {
+                "avgAppearances": round(sum(player_counts[player_key(p)] for p in players) / count, 2),
+                "rareNationalityShare": round(sum(p["nationality"] in rare for p in players) / count, 3),
+                "otherClubs": [[t for t in player_teams[player_key(p)] if t != team] for p in players],
+            }
+        hints[match["id"]] = entry
+
+    return {
+        "players": {
+            key: [[team, season, position, n] for (team, season, position), n in sorted(spells.items())]
+            for key, spells in sorted(player_spells.items())
+        },
+        "rosters": {key: sorted(players) for key, players in sorted(rosters.items())},
+        "match_hints": hints,
+    }
+
+
+def write_indexes(matches: list[dict], data_dir: Path) -> list[Path]:
+    """Write the side files into data_dir, skipping any whose content is unchanged."""
+    written = []
+    data_dir.mkdir(parents=True, exist_ok=True)
+    for stem, content in build_indexes(matches).items():
+        path = data_dir / f"{stem}.json"
+        text = json.dumps(content, ensure_ascii=False, separators=(",", ":"))
+        if path.exists() and path.read_text(encoding="utf-8") == text:
+            continue
+        path.write_text(text, encoding="utf-8")
+        written.append(path)
+    return written
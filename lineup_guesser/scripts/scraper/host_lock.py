@@ -0,0 +1,99 @@
+"""
+Cross-process coordination for PLClient: file locks, a host-wide rate limiter
+and per-request locks used to coalesce concurrent fetches of the same URL.
+"""
+
+import hashlib
+import os
+import struct
+import tempfile
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Shared by every PLClient on this machine, whatever cache directory it uses
+RATE_LIMIT_FILE = Path(tempfile.gettempdir()) / "pl_scraper_ratelimit.lock"
+LOCK_STRIPES = 256
+
+
+class FileLock:
+    """Exclusive advisory lock on a file, held for the duration of a with-block."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.fd: int | None = None
+
+    def __enter__(self) -> int:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+        if fcntl:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+        else:
+            while True:
+                try:
+                    msvcrt.locking(self.fd, msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after ~10s; keep waiting
+                    continue
+        return self.fd
+
+    def __exit__(self, *exc):
+        if fcntl:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(self.fd, 0, os.SEEK_SET)
+            msvcrt.locking(self.fd, msvcrt.LK_UNLCK, 1)
+        os.close(self.fd)
+        self.fd = None
+
+
+class SharedRateLimiter:
+    """
+    Host-wide request pacing. The lock file holds the time at which the next
+    request may start; callers reserve a slot under the lock and sleep outside
+    it, so processes queue up without holding the lock while waiting.
+    """
+
+    _FORMAT = "d"
+
+    def __init__(self, delay: float, path: Path = RATE_LIMIT_FILE):
+        self.delay = delay
+        self.path = path
+
+    def _read(self, fd: int) -> float:
+        os.lseek(fd, 0, os.SEEK_SET)
+        raw = os.read(fd, struct.calcsize(self._FORMAT))
+        return struct.unpack(self._FORMAT, raw)[0] if len(raw) == struct.calcsize(self._FORMAT) else 0.0
+
+    def _write(self, fd: int, value: float):
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.write(fd, struct.pack(self._FORMAT, value))
+
+    def acquire(self):
+        """Block until this process may send a request."""
+        with FileLock(self.path) as fd:
+            now = time.time()
+            slot = max(now, self._read(fd))
+            self._write(fd, slot + self.delay)
+        if slot > now:
+            time.sleep(slot - now)
+
+    def release(self):
+        """Push the next slot back so the delay also counts from when a slow response finished."""
+        with FileLock(self.path) as fd:
+            self._write(fd, max(self._read(fd), time.time() + self.delay))
+
+
+def request_lock(lock_dir: Path, key: str) -> FileLock:
+    """
+    Lock for one cache key. Keys are striped over a fixed set of files so the
+    lock directory does not grow with the cache.
+    """
+    stripe = int(hashlib.md5(key.encode()).hexdigest(), 16) % LOCK_STRIPES
+    return FileLock(lock_dir / f"{stripe:02x}.lock")
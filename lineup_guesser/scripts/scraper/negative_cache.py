@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Persisted record of fixtures known to be unusable (missing formations, short
+lineups, missing team lists), so samplers and rebuilds skip them without I/O.
+
+Entries are tied to parsers.PARSER_VERSION: when the parser version changes the
+whole cache is discarded and every fixture gets another chance.
+
+Usage:
+    python negative_cache.py stats
+    python negative_cache.py clear
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import logging
+import math
+from collections import Counter
+from pathlib import Path
+
+from parsers import PARSER_VERSION
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = Path(__file__).parent / ".cache" / "rejected.json"
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over fixture IDs (no false negatives)."""
+
+    def __init__(self, capacity: int = 20000, error_rate: float = 0.01, bits: bytes | None = None):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(bits) if bits is not None else bytearray((self.size + 7) // 8)
+        self.capacity = capacity
+        self.error_rate = error_rate
+
+    def _positions(self, item: int):
+        h = hashlib.blake2b(str(item).encode(), digest_size=16).digest()
+        h1 = int.from_bytes(h[:8], "little")
+        h2 = int.from_bytes(h[8:], "little") | 1
+        # Double hashing: k positions from two base hashes
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: int):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: int) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def to_dict(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "error_rate": self.error_rate,
+            "bits": base64.b64encode(bytes(self.bits)).decode("ascii"),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BloomFilter":
+        return cls(data["capacity"], data["error_rate"], base64.b64decode(data["bits"]))
+
+
+class NegativeCache:
+    """
+    Fixture ID → rejection reason for the current parser version.
+
+    With `use_bloom`, membership tests consult a Bloom filter first, so the
+    common "not rejected" answer never touches the reason map.
+    """
+
+    def __init__(self, path: Path = DEFAULT_PATH, use_bloom: bool = False):
+        self.path = path
+        self.rejected: dict[str, str] = {}
+        self.bloom = BloomFilter() if use_bloom else None
+        self.dirty = False
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        data = json.loads(self.path.read_text(encoding="utf-8"))
+        if data.get("parser_version") != PARSER_VERSION:
+            logger.info(
+                f"Parser version changed ({data.get('parser_version')} → {PARSER_VERSION}), "
+                f"discarding {len(data.get('rejected', {}))} rejected fixtures"
+            )
+            self.dirty = True
+            return
+        self.rejected = data.get("rejected", {})
+        if self.bloom is not None:
+            if data.get("bloom") and len(self.rejected) <= data["bloom"]["capacity"]:
+                self.bloom = BloomFilter.from_dict(data["bloom"])
+            else:
+                self._rebuild_bloom()
+
+    def _rebuild_bloom(self):
+        self.bloom = BloomFilter(capacity=max(20000, 2 * len(self.rejected)))
+        for fid in self.rejected:
+            self.bloom.add(int(fid))
+
+    def __contains__(self, fixture_id: int) -> bool:
+        if self.bloom is not None and fixture_id not in self.bloom:
+            return False
+        return str(fixture_id) in self.rejected
+
+    def __len__(self) -> int:
+        return len(self.rejected)
+
+    def reason(self, fixture_id: int) -> str | None:
+        return self.rejected.get(str(fixture_id))
+
+    def add(self, fixture_id: int, reason: str):
+        if self.rejected.get(str(fixture_id)) == reason:
+            return
+        self.rejected[str(fixture_id)] = reason
+        if self.bloom is not None:
+            if len(self.rejected) > self.bloom.capacity:
+                self._rebuild_bloom()
+            else:
+                self.bloom.add(fixture_id)
+        self.dirty = True
+
+    def clear(self):
+        self.rejected = {}
+        if self.bloom is not None:
+            self.bloom = BloomFilter()
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        data = {"parser_version": PARSER_VERSION, "rejected": self.rejected}
+        if self.bloom is not None:
+            data["bloom"] = self.bloom.to_dict()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        tmp.replace(self.path)
+        self.dirty = False
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Inspect the rejected-fixture cache")
+    parser.add_argument("--path", type=Path, default=DEFAULT_PATH, help="Negative cache file")
+    parser.add_argument("command", choices=["stats", "clear"])
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    cache = NegativeCache(args.path)
+
+    if args.command == "clear":
+        count = len(cache)
+        cache.clear()
+        cache.save()
+        print(f"Cleared {count} rejected fixtures")
+    else:
+        print(f"Parser version {PARSER_VERSION}: {len(cache)} rejected fixtures")
+        for reason, count in Counter(cache.rejected.values()).most_common():
+            print(f"  {reason:<20} {count:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,15 @@ from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever parsing rules change, so fixtures rejected by an older parser are retried
+PARSER_VERSION = 1
+
+# Reasons a fixture is unusable for the game
+REJECT_MISSING_TEAM_LISTS = "missing_team_lists"
+REJECT_SHORT_LINEUP = "short_lineup"
+REJECT_MISSING_FORMATION = "missing_formation"
+REJECT_INCOMPLETE = "incomplete"
+
 # Map API position codes to our position categories
 POSITION_MAP = {
     "G": "GK",
@@ -129,6 +138,27 @@ def parse_team_list(team_list: dict) -> dict | None:
     }
 
 
+def team_sides(teams: list[dict]) -> tuple[dict | None, dict | None]:
+    """The (home, away) entries of a fixture's teams."""
+    home = None
+    away = None
+    for t in teams:
+        side = t.get("side")  # Not always present
+        if not side:
+            # Fall back to the "teamType" field
+            side = t.get("teamType", "")
+        if side == "home":
+            home = t
+        elif side == "away":
+            away = t
+
+    if not (home and home.get("team") and away and away.get("team")):
+        # Sometimes teams are just [home, away] in order
+        home = teams[0] if len(teams) > 0 else None
+        away = teams[1] if len(teams) > 1 else None
+    return home, away
+
+
 def parse_match(data: dict) -> dict | None:
     """
     Parse full match detail JSON into our intermediate format.
@@ -145,27 +175,11 @@ def parse_match(data: dict) -> dict | None:
     if len(teams) < 2:
         return None
 
-    home_team = None
-    away_team = None
-    for t in teams:
-        team_data = t.get("team", {})
-        side = t.get("side")  # Not always present
-        if not side:
-            # Fall back to the "teamType" field
-            side = t.get("teamType", "")
-        if side == "home":
-            home_team = team_data
-            home_score = t.get("score", 0)
-        elif side == "away":
-            away_team = team_data
-            away_score = t.get("score", 0)
-
-    if not home_team or not away_team:
-        # Sometimes teams are just [home, away] in order
-        home_team = teams[0].get("team", {})
-        home_score = teams[0].get("score", 0)
-        away_team = teams[1].get("team", {})
-        away_score = teams[1].get("score", 0)
+    home, away = team_sides(teams)
+    home_team = home.get("team", {})
+    home_score = home.get("score", 0)
+    away_team = away.get("team", {})
+    away_score = away.get("score", 0)
 
     # Team lists (lineups)
     team_lists = data.get("teamLists", [])
@@ -208,3 +222,24 @@ def parse_match(data: dict) -> dict | None:
         "home_lineup": home_lineup,
         "away_lineup": away_lineup,
     }
+
+
+def check_match(data: dict) -> tuple[dict | None, str | None]:
+    """
+    Parse match detail JSON and check it is usable for the game.
+    Returns (parsed, None) on success or (None, reason) with a REJECT_* reason.
+    """
+    parsed = parse_match(data)
+    if not parsed:
+        team_lists = data.get("teamLists", [])
+        if len(team_lists) < 2:
+            return None, REJECT_MISSING_TEAM_LISTS
+        if any(len(tl.get("lineup", [])) != 11 for tl in team_lists):
+            return None, REJECT_SHORT_LINEUP
+        return None, REJECT_INCOMPLETE
+
+    # Formations are crucial for the game
+    if not parsed["home_lineup"].get("formation") or not parsed["away_lineup"].get("formation"):
+        return None, REJECT_MISSING_FORMATION
+
+    return parsed, None
@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Incremental build graph for the dataset:
+fetch → parse → transform → store → delta → publish.
+
+Each stage fingerprints its inputs, the source of the modules it runs and its
+config. If the fingerprint matches the one recorded on the previous run the
+stage is skipped and its cached artifact is reused. The per-match stages
+(fetch, parse, transform) also memoize every fixture on its own, so a change
+to one raw fixture or one parser tweak only redoes the affected matches.
+
+The fixture list is written by scrape_matches.py; this script rebuilds from it.
+The matches are synced into the SQLite dataset store (dataset_store.py) and
+the full export, manual and watch rows included, is validated before the sync
+commits. matches.json is exported from the store, and never replaced by an
+export that is empty or smaller than the one validated.
+
+Usage:
+    python pipeline.py [--output ../../src/data/matches.json] [--force]
+    python pipeline.py --columnar columnar  # also write the Parquet export
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+from cache_files import read_cache_file
+from dataset_store import DEFAULT_OUTPUT, DEFAULT_STORE_PATH, DatasetStore
+from delta import DEFAULT_RELEASES_DIR
+from fbref_client import DEFAULT_CACHE_DIR, PLClient, cache_key, match_detail_url
+from hint_index import DEFAULT_HINTS_DIR, HINT_FILES
+from negative_cache import NegativeCache
+from workspace import Workspace
+
+logger = logging.getLogger(__name__)
+
+SCRIPT_DIR = Path(__file__).parent
+BUILD_DIR = DEFAULT_CACHE_DIR / "build"
+FIXTURES_FILE = BUILD_DIR / "fixtures.json"
+
+# name → (upstream stages, modules whose source is part of the fingerprint)
+STAGES: dict[str, tuple[tuple[str, ...], tuple[str, ...]]] = {
+    "fetch": ((), ("fbref_client",)),
+    "parse": (("fetch",), ("parsers",)),
+    "transform": (("parse",), ("transform", "normalize", "formation_mapper")),
+    "store": (("transform",), ("dataset_store", "validate", "formation_mapper")),
+    "delta": (("store",), ("delta", "transform", "dataset_store")),
+    "publish": (("store",), ("transform", "dataset_store", "hint_index", "columnar")),
+}
+
+
+class PipelineError(Exception):
+    """A stage failed and downstream stages must not run."""
+
+
+def digest(*parts: str | bytes) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode() if isinstance(part, str) else part)
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def hash_json(obj) -> str:
+    return digest(json.dumps(obj, sort_keys=True, ensure_ascii=False))
+
+
+def hash_sources(modules: tuple[str, ...]) -> str:
+    return digest(*((SCRIPT_DIR / f"{m}.py").read_bytes() for m in modules))
+
+
+def stat_signature(path: Path) -> str | None:
+    """Cheap change detector: size and mtime, or None if the file is missing."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def read_fixture_ids(path: Path = FIXTURES_FILE) -> list[int]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_fixture_ids(fixture_ids: list[int], path: Path = FIXTURES_FILE):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(fixture_ids, f)
+
+
+def record_delta(matches: list[dict], output_path: Path, releases_dir: Path) -> dict | None:
+    """Record the delta from the currently published file to matches, before it is overwritten."""
+    from delta import publish_delta
+
+    base = None
+    if output_path.exists():
+        base = json.loads(output_path.read_text(encoding="utf-8"))
+    delta = publish_delta(base, matches, releases_dir)
+    if delta:
+        logger.info(
+            f"Delta {delta['base']} → {delta['version']}: {len(delta['added'])} added, "
+            f"{len(delta['removed'])} removed, {len(delta['changed'])} changed"
+        )
+    return delta
+
+
+def write_outputs(
+    matches: list[dict],
+    output_path: Path,
+    hints_dir: Path = DEFAULT_HINTS_DIR,
+    columnar_dir: Path | None = None,
+    columnar_format: str = "parquet",
+):
+    """Write matches.json, the hint files into hints_dir and optionally the columnar export."""
+    from hint_index import write_indexes
+    from transform import write_matches
+
+    if write_matches(matches, output_path):
+        logger.info(f"Wrote {len(matches)} matches to {output_path}")
+    else:
+        logger.info(f"{output_path} unchanged")
+
+    for path in write_indexes(matches, hints_dir):
+        logger.info(f"Wrote {path}")
+
+    if columnar_dir is not None:
+        from columnar import write_columnar
+
+        paths = write_columnar(matches, columnar_dir, columnar_format)
+        logger.info(f"Wrote columnar export to {', '.join(str(p) for p in paths.values())}")
+
+
+def publish(
+    matches: list[dict],
+    output_path: Path,
+    releases_dir: Path | None = DEFAULT_RELEASES_DIR,
+    hints_dir: Path = DEFAULT_HINTS_DIR,
+):
+    """
+    Publish a dataset produced outside the build graph (reprocess, watch) the way
+    the pipeline does: validate it, record the delta, then write the output files.
+    """
+    from validate import validate_matches
+
+    if not matches:
+        raise PipelineError("refusing to publish an empty dataset")
+    if not validate_matches(matches):
+        raise PipelineError("validation failed, not publishing")
+    if releases_dir is not None:
+        record_delta(matches, output_path, releases_dir)
+    write_outputs(matches, output_path, hints_dir)
+
+
+class Pipeline:
+    """Runs the stage graph, skipping stages whose fingerprint is unchanged."""
+
+    def __init__(
+        self,
+        fixture_ids: list[int],
+        output_path: Path = DEFAULT_OUTPUT,
+        client: PLClient | None = None,
+        build_dir: Path = BUILD_DIR,
+        cache_dir: Path = DEFAULT_CACHE_DIR,
+        negative_cache: NegativeCache | None = None,
+        releases_dir: Path | None = DEFAULT_RELEASES_DIR,
+        hints_dir: Path = DEFAULT_HINTS_DIR,
+        columnar_dir: Path | None = None,
+        columnar_format: str = "parquet",
+        store_path: Path = DEFAULT_STORE_PATH,
+    ):
+        # An empty cache is falsy (it has a length), so test for None explicitly
+        if negative_cache is None:
+            negative_cache = NegativeCache(cache_dir / "rejected.json")
+        self.negative_cache = negative_cache
+        # Fixtures already known to be unusable are dropped before any stage looks at them
+        self.fixture_ids = [int(fid) for fid in fixture_ids if int(fid) not in self.negative_cache]
+        self.output_path = output_path
+        self.releases_dir = releases_dir
+        self.hints_dir = hints_dir
+        self.columnar_dir = columnar_dir
+        self.columnar_format = columnar_format
+        self.store_path = store_path
+        self._exported: list[dict] | None = None
+        self.build_dir = build_dir
+        self.cache_dir = cache_dir
+        self._client = client
+        self.state_file = build_dir / "state.json"
+        self.state: dict[str, dict] = {}
+        if self.state_file.exists():
+            self.state = json.loads(self.state_file.read_text(encoding="utf-8"))
+        self._artifacts: dict[str, dict] = {}
+
+    @property
+    def client(self) -> PLClient:
+        if self._client is None:
+            self._client = PLClient(self.cache_dir)
+        return self._client
+
+    # -- bookkeeping ---------------------------------------------------------
+
+    def _artifact_path(self, stage: str) -> Path:
+        return self.build_dir / f"{stage}.json"
+
+    def artifact(self, stage: str) -> dict:
+        """Load a stage's artifact (from memory if it ran in this process)."""
+        if stage not in self._artifacts:
+            path = self._artifact_path(stage)
+            if path.exists():
+                self._artifacts[stage] = json.loads(path.read_text(encoding="utf-8"))
+            else:
+                self._artifacts[stage] = {}
+        return self._artifacts[stage]
+
+    def _save_artifact(self, stage: str, artifact: dict) -> str:
+        self._artifacts[stage] = artifact
+        self.build_dir.mkdir(parents=True, exist_ok=True)
+        self._artifact_path(stage).write_text(json.dumps(artifact, ensure_ascii=False), encoding="utf-8")
+        return hash_json(artifact)
+
+    def _external_inputs(self, stage: str) -> str:
+        """Fingerprint of inputs that live outside the build graph."""
+        if stage == "fetch":
+            sigs = [
+                f"{fid}={stat_signature(self._detail_path(fid))}" for fid in self.fixture_ids
+            ]
+            return digest(*sigs)
+        # Other tools edit the store directly, so its file is an input downstream of it
+        store_sig = str(stat_signature(self.store_path))
+        if stage == "store":
+            return digest(str(self.store_path.resolve()), store_sig)
+        if stage == "delta":
+            # Not the output file: publish rewrites it right after, which would make every rerun stale
+            return digest(str(self.releases_dir.resolve()) if self.releases_dir else "", store_sig)
+        if stage == "publish":
+            sigs = [str(self.output_path.resolve()), str(stat_signature(self.output_path)), store_sig]
+            sigs.append(str(self.hints_dir.resolve()))
+            for stem in HINT_FILES:
+                sigs.append(str(stat_signature(self.hints_dir / f"{stem}.json")))
+            if self.columnar_dir is not None:
+                from columnar import FORMATS
+
+                for table in ("matches", "appearances"):
+                    path = self.columnar_dir / f"{table}{FORMATS[self.columnar_format]}"
+                    sigs += [str(path.resolve()), str(stat_signature(path))]
+            return digest(*sigs)
+        return ""
+
+    def _detail_path(self, fixture_id: int) -> Path:
+        return self.cache_dir / f"{cache_key(match_detail_url(fixture_id))}.json"
+
+    # -- driver --------------------------------------------------------------
+
+    def run(self, force: bool = False) -> dict[str, bool]:
+        """Run every stage in order. Returns {stage: ran} (False = skipped)."""
+        ran: dict[str, bool] = {}
+        for stage, (deps, modules) in STAGES.items():
+            key = digest(
+                stage,
+                hash_sources(modules),
+                self._external_inputs(stage),
+                *(self.state[dep]["output"] for dep in deps),
+            )
+            previous = self.state.get(stage)
+            if (
+                not force
+                and previous
+                and previous["input"] == key
+                and self._artifact_path(stage).exists()
+            ):
+                logger.info(f"[{stage}] up to date, skipping")
+                ran[stage] = False
+                continue
+
+            logger.info(f"[{stage}] running")
+            artifact = getattr(self, f"_run_{stage}")()
+            output = self._save_artifact(stage, artifact)
+            # These stages write their own external inputs, so re-fingerprint afterwards
+            if stage in ("store", "publish"):
+                key = digest(
+                    stage,
+                    hash_sources(modules),
+                    self._external_inputs(stage),
+                    *(self.state[dep]["output"] for dep in deps),
+                )
+            self.state[stage] = {"input": key, "output": output}
+            self.state_file.write_text(json.dumps(self.state, indent=2), encoding="utf-8")
+            self.negative_cache.save()
+            ran[stage] = True
+        return ran
+
+    def _memoized(self, stage: str, upstream: str, code: str, compute) -> dict:
+        """
+        Per-fixture memoization: reuse an item when its upstream output and the
+        stage's code are unchanged, otherwise call compute(fixture_id, upstream_item).
+        """
+        previous = self.artifact(stage).get("items", {})
+        upstream_items = self.artifact(upstream).get("items", {})
+        items = {}
+        redone = 0
+        for fid, up in upstream_items.items():
+            item_key = digest(code, up["out"])
+            old = previous.get(fid)
+            if old and old["in"] == item_key:
+                items[fid] = old
+                continue
+            value = compute(int(fid), up)
+            items[fid] = {"in": item_key, "out": hash_json(value), "value": value}
+            redone += 1
+        logger.info(f"[{stage}] {redone} of {len(items)} fixtures recomputed")
+        return {"items": items}
+
+    # -- stages --------------------------------------------------------------
+
+    def _run_fetch(self) -> dict:
+        previous = self.artifact("fetch").get("items", {})
+        items = {}
+        for fid in self.fixture_ids:
+            path = self._detail_path(fid)
+            sig = stat_signature(path)
+            old = previous.get(str(fid))
+            if sig is not None and old and old["in"] == sig:
+                items[str(fid)] = old
+                continue
+            try:
+                # Returns the cached copy, or (re)fetches it if missing or unreadable
+                self.client.get_match_detail(fid)
+            except Exception as e:
+                logger.warning(f"  Failed fixture {fid}: {e}")
+                continue
+            sig = stat_signature(path)
+            items[str(fid)] = {"in": sig, "out": digest(path.read_bytes()), "value": path.name}
+        return {"items": items}
+
+    def _run_parse(self) -> dict:
+        from parsers import check_match
+
+        def compute(fid: int, fetched: dict) -> dict | None:
+            detail = read_cache_file(self.cache_dir / fetched["value"])
+            parsed, reason = check_match(detail)
+            if reason:
+                logger.debug(f"  Skipping {fid}: {reason}")
+                self.negative_cache.add(fid, reason)
+            return parsed
+
+        return self._memoized("parse", "fetch", hash_sources(STAGES["parse"][1]), compute)
+
+    def _run_transform(self) -> dict:
+        from transform import transform_match
+
+        def compute(fid: int, parsed: dict) -> dict | None:
+            return transform_match(parsed["value"]) if parsed["value"] else None
+
+        return self._memoized("transform", "parse", hash_sources(STAGES["transform"][1]), compute)
+
+    def matches(self) -> list[dict]:
+        """Transformed matches in fixture-list order."""
+        items = self.artifact("transform").get("items", {})
+        matches = []
+        for fid in self.fixture_ids:
+            item = items.get(str(fid))
+            if item and item["value"]:
+                matches.append(item["value"])
+        return matches
+
+    def _run_store(self) -> dict:
+        from validate import validate_matches
+
+        def check(exported: list[dict]) -> bool:
+            # Validate what will be published, not just the pipeline's own matches
+            self._exported = exported
+            return bool(exported) and validate_matches(exported)
+
+        store = DatasetStore(self.store_path)
+        try:
+            changed, removed = store.sync_source(self.matches(), "pipeline", check=check)
+        except ValueError as e:
+            self._exported = None
+            raise PipelineError(f"validation failed, not publishing: {e}") from e
+        finally:
+            store.close()
+        logger.info(f"[store] {changed} matches upserted, {removed} removed")
+        return {"changed": changed, "removed": removed, "count": len(self._exported)}
+
+    def exported(self) -> list[dict]:
+        """The full dataset as exported from the store (cached for this run)."""
+        if self._exported is None:
+            store = DatasetStore(self.store_path)
+            try:
+                self._exported = store.export_matches()
+            finally:
+                store.close()
+        return self._exported
+
+    def _checked_export(self) -> list[dict]:
+        """The export, refusing one that is empty or smaller than what the store stage validated."""
+        matches = self.exported()
+        validated = self.artifact("store").get("count", 0)
+        if not matches or len(matches) < validated:
+            raise PipelineError(
+                f"store exports {len(matches)} matches but {validated} were validated, not publishing"
+            )
+        return matches
+
+    def _run_delta(self) -> dict:
+        """Diff against the currently published file before publish overwrites it."""
+        from delta import dataset_version
+
+        matches = self._checked_export()
+        if self.releases_dir is not None:
+            record_delta(matches, self.output_path, self.releases_dir)
+        return {"version": dataset_version(matches)}
+
+    def _run_publish(self) -> dict:
+        matches = self._checked_export()
+        write_outputs(matches, self.output_path, self.hints_dir, self.columnar_dir, self.columnar_format)
+        return {"count": len(matches)}
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--fixtures", type=Path, help="Fixture ID list to build from (default: the one scrape_matches.py wrote)")
+    parser.add_argument("--releases", type=Path, default=DEFAULT_RELEASES_DIR, help="Directory for version chain and deltas")
+    parser.add_argument("--no-delta", action="store_true", help="Do not record a delta for this build")
+    parser.add_argument("--hints", type=Path, default=DEFAULT_HINTS_DIR, help="Directory for the hint index files")
+    parser.add_argument("--columnar", type=Path, help="Also write a Parquet/Arrow export to this directory")
+    parser.add_argument("--columnar-format", choices=["parquet", "arrow"], default="parquet")
+    parser.add_argument("--force", action="store_true", help="Ignore recorded fingerprints and rerun every stage")
+
+
+def run(args: argparse.Namespace, workspace: Workspace):
+    pipeline = Pipeline(
+        read_fixture_ids(args.fixtures or workspace.build_dir / "fixtures.json"),
+        workspace.output_path,
+        client=workspace.client,
+        build_dir=workspace.build_dir,
+        cache_dir=workspace.cache_dir,
+        negative_cache=workspace.negative_cache,
+        releases_dir=None if args.no_delta else args.releases,
+        hints_dir=args.hints,
+        columnar_dir=args.columnar,
+        columnar_format=args.columnar_format,
+        store_path=workspace.store_path,
+    )
+    pipeline.run(force=args.force)
+    workspace.set_matches(pipeline.exported())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally rebuild matches.json")
+    Workspace.add_arguments(parser)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    workspace = Workspace.from_args(args)
+    try:
+        run(args, workspace)
+    finally:
+        workspace.close()
+
+
+if __name__ == "__main__":
+    main()
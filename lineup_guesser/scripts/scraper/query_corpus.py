@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Filtered aggregations over the columnar export written by columnar.py.
+
+Filters are pushed down to the Parquet/Arrow scan, so only matching row
+groups and the referenced columns are read. Requires pyarrow.
+
+Grouped queries count distinct matches by default; appearances rows are per
+player, so use `--agg match_id:count` to count those instead.
+
+Usage:
+    python query_corpus.py --team Arsenal --season 2014/15 --group-by formation
+    python query_corpus.py --group-by team,season --agg age:mean
+    python query_corpus.py --table matches --where "home_score>=4" --columns date,home_team,away_team,home_score
+"""
+
+import argparse
+import re
+import sys
+from pathlib import Path
+
+from columnar import FORMATS
+
+DEFAULT_DIR = Path(__file__).parent / "columnar"
+AGGREGATIONS = {"count", "mean", "min", "max", "sum", "count_distinct"}
+WHERE_PATTERN = re.compile(r"^\s*(\w+)\s*(==|=|!=|>=|<=|>|<)\s*(.+?)\s*$")
+
+
+def open_dataset(data_dir: Path, table: str):
+    import pyarrow.dataset as ds
+    from pyarrow.fs import LocalFileSystem
+
+    for fmt, suffix in FORMATS.items():
+        path = data_dir / f"{table}{suffix}"
+        if path.exists():
+            if fmt == "parquet":
+                return ds.dataset(str(path), format="parquet")
+            # Arrow IPC files are memory-mapped rather than read into memory
+            return ds.dataset(str(path), format="ipc", filesystem=LocalFileSystem(use_mmap=True))
+    raise FileNotFoundError(f"No {table} table in {data_dir} (run the pipeline with --columnar)")
+
+
+def _coerce(dataset, column: str, raw: str):
+    import pyarrow as pa
+
+    field_type = dataset.schema.field(column).type
+    if pa.types.is_dictionary(field_type):
+        field_type = field_type.value_type
+    if pa.types.is_integer(field_type):
+        return int(raw)
+    if pa.types.is_floating(field_type):
+        return float(raw)
+    return raw
+
+
+def build_filter(dataset, conditions: list[str]):
+    """Turn ["season=2014/15", "age>=30"] into one pyarrow expression (ANDed)."""
+    import pyarrow.dataset as ds
+
+    expression = None
+    for condition in conditions:
+        match = WHERE_PATTERN.match(condition)
+        if not match:
+            raise ValueError(f"Cannot parse filter {condition!r}")
+        column, op, raw = match.groups()
+        if column not in dataset.schema.names:
+            raise ValueError(f"Unknown column {column!r}")
+        field, value = ds.field(column), _coerce(dataset, column, raw)
+        term = {
+            "=": field == value,
+            "==": field == value,
+            "!=": field != value,
+            ">=": field >= value,
+            "<=": field <= value,
+            ">": field > value,
+            "<": field < value,
+        }[op]
+        expression = term if expression is None else expression & term
+    return expression
+
+
+def run_query(
+    data_dir: Path,
+    table: str = "appearances",
+    where: list[str] | None = None,
+    group_by: list[str] | None = None,
+    aggregations: list[str] | None = None,
+    columns: list[str] | None = None,
+):
+    """Scan with pushed-down filters, then optionally group and aggregate. Returns a pyarrow Table."""
+    dataset = open_dataset(data_dir, table)
+    expression = build_filter(dataset, where or [])
+
+    if not group_by:
+        return dataset.to_table(columns=columns, filter=expression)
+
+    aggs = []
+    # Appearances have a row per player, so the default counts matches, not rows
+    for spec in aggregations or ["match_id:count_distinct"]:
+        column, _, func = spec.rpartition(":")
+        if func not in AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation {func!r} (expected one of {', '.join(sorted(AGGREGATIONS))})")
+        aggs.append((column or "match_id", func))
+
+    needed = sorted(set(group_by) | {column for column, _ in aggs})
+    scanned = dataset.to_table(columns=needed, filter=expression)
+    # Grouping on dictionary columns is not supported everywhere; decode them first
+    for name in group_by:
+        index = scanned.column_names.index(name)
+        if hasattr(scanned[name].type, "value_type"):
+            scanned = scanned.set_column(index, name, scanned[name].cast(scanned[name].type.value_type))
+    result = scanned.group_by(group_by).aggregate(aggs)
+    return result.sort_by([(name, "ascending") for name in group_by])
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Query the columnar lineup corpus")
+    parser.add_argument("--dir", type=Path, default=DEFAULT_DIR, help="Directory with the columnar export")
+    parser.add_argument("--table", choices=["appearances", "matches"], default="appearances")
+    parser.add_argument("--where", action="append", default=[], help="Filter, e.g. 'age>=30' (repeatable)")
+    parser.add_argument("--team", help="Shortcut for --where team=TEAM")
+    parser.add_argument("--season", help="Shortcut for --where season=SEASON")
+    parser.add_argument("--group-by", help="Comma-separated grouping columns")
+    parser.add_argument("--agg", action="append", help="column:func, e.g. age:mean (default: match_id:count_distinct)")
+    parser.add_argument("--columns", help="Comma-separated columns to print (no grouping)")
+    parser.add_argument("--limit", type=int, default=50, help="Rows to print (default: 50)")
+    args = parser.parse_args(argv)
+
+    where = list(args.where)
+    if args.team:
+        where.append(f"team={args.team}")
+    if args.season:
+        where.append(f"season={args.season}")
+
+    try:
+        result = run_query(
+            args.dir,
+            table=args.table,
+            where=where,
+            group_by=args.group_by.split(",") if args.group_by else None,
+            aggregations=args.agg,
+            columns=args.columns.split(",") if args.columns else None,
+        )
+    except (ValueError, FileNotFoundError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    rows = result.slice(0, args.limit).to_pylist()
+    print("\t".join(result.column_names))
+    for row in rows:
+        print("\t".join("" if v is None else f"{v:.2f}" if isinstance(v, float) else str(v) for v in row.values()))
+    if result.num_rows > args.limit:
+        print(f"... {result.num_rows - args.limit} more rows", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
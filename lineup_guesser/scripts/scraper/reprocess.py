@@ -1,66 +1,72 @@
-"""One-off script to reprocess matches.json: remove pre-2010 matches and re-apply name extraction."""
+"""One-off script to reprocess the dataset: remove pre-2010 matches and re-apply name extraction.
 
+Works on the SQLite dataset store (seeded from matches.json on first use) and
+re-publishes matches.json the way the pipeline does (delta, hint files), so
+only the affected rows are touched.
+"""
+
+import argparse
 import json
-import sys
+import logging
 from pathlib import Path
 
-from normalize import normalize_name, extract_last_name
+from delta import DEFAULT_RELEASES_DIR
+from hint_index import DEFAULT_HINTS_DIR
+from pipeline import publish
+from workspace import Workspace
 
-MATCHES_PATH = Path(__file__).resolve().parent.parent.parent / "src" / "data" / "matches.json"
 MIN_DATE = "2010-01-01"
 
 
-def reprocess_player(player: dict) -> dict:
-    """Re-apply extract_last_name with updated overrides."""
-    name = player["name"]
-    last_name, alternate_names = extract_last_name(name)
-
-    player["lastName"] = last_name
-    player["lastNameNormalized"] = normalize_name(last_name)
-
-    if alternate_names:
-        player["alternateNames"] = alternate_names
-    elif "alternateNames" in player:
-        del player["alternateNames"]
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--releases", type=Path, default=DEFAULT_RELEASES_DIR, help="Directory for version chain and deltas")
+    parser.add_argument("--no-delta", action="store_true", help="Do not record a delta for this change")
+    parser.add_argument("--hints", type=Path, default=DEFAULT_HINTS_DIR, help="Directory for the hint index files")
 
-    return player
 
+def run(args: argparse.Namespace, workspace: Workspace):
+    store = workspace.store
+    output_path = workspace.output_path
 
-def main():
-    with open(MATCHES_PATH, "r", encoding="utf-8") as f:
-        matches = json.load(f)
+    if not store.match_ids() and output_path.exists():
+        with open(output_path, "r", encoding="utf-8") as f:
+            store.upsert_matches(json.load(f))
 
-    original_count = len(matches)
+    original_count = len(store.match_ids())
 
     # Remove pre-2010 matches
-    matches = [m for m in matches if m["date"] >= MIN_DATE]
-    removed = original_count - len(matches)
-    print(f"Removed {removed} pre-2010 matches ({original_count} → {len(matches)})")
+    removed = store.delete_before(MIN_DATE)
+    print(f"Removed {removed} pre-2010 matches ({original_count} → {original_count - removed})")
 
     # Re-apply name extraction to all players
-    names_changed = 0
-    for match in matches:
-        for side in ["homeLineup", "awayLineup"]:
-            lineup = match.get(side, {})
-            for player in lineup.get("players", []):
-                old_last = player.get("lastName", "")
-                reprocess_player(player)
-                if player["lastName"] != old_last:
-                    names_changed += 1
-                    print(f"  {player['name']}: {old_last!r} → {player['lastName']!r}")
-
-    print(f"Updated {names_changed} player last names")
+    changes = store.reprocess_players()
+    for name, old_last, new_last in changes:
+        print(f"  {name}: {old_last!r} → {new_last!r}")
+    print(f"Updated {len(changes)} player last names")
 
     # Verify no pre-2010 matches remain
+    matches = store.export_matches()
     earliest = min(m["date"] for m in matches)
     print(f"Earliest match date: {earliest}")
     assert earliest >= MIN_DATE, f"Still have pre-2010 matches! Earliest: {earliest}"
 
-    with open(MATCHES_PATH, "w", encoding="utf-8") as f:
-        json.dump(matches, f, ensure_ascii=False, indent=2)
-        f.write("\n")
+    publish(matches, output_path, None if args.no_delta else args.releases, args.hints)
+    workspace.set_matches(matches)
+
 
-    print(f"Wrote {len(matches)} matches to {MATCHES_PATH}")
+def main():
+    parser = argparse.ArgumentParser(description="Drop pre-2010 matches and re-apply last name extraction")
+    Workspace.add_arguments(parser)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    workspace = Workspace.from_args(args)
+    try:
+        run(args, workspace)
+    finally:
+        workspace.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,131 @@
+"""Sample fixtures until a quota of usable matches is reached."""
+
+import logging
+import random
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from fbref_client import PLClient
+from negative_cache import NegativeCache
+from parsers import check_match
+
+logger = logging.getLogger(__name__)
+
+# Listing statuses: C = completed, U = upcoming, L = live
+COMPLETED_STATUS = "C"
+
+
+def team_names(fixture: dict) -> list[str]:
+    return [(t.get("team") or {}).get("name", "") for t in fixture.get("teams") or []]
+
+
+def is_candidate(fixture: dict, now_millis: float | None = None) -> bool:
+    """
+    Decide from listing metadata alone whether a fixture is worth fetching:
+    it must be completed, already kicked off and have both teams.
+    Postponed and abandoned fixtures never reach the completed status.
+    """
+    if fixture.get("status") != COMPLETED_STATUS:
+        return False
+    if len([name for name in team_names(fixture) if name]) != 2:
+        return False
+    millis = (fixture.get("kickoff") or {}).get("millis")
+    now_millis = now_millis if now_millis is not None else time.time() * 1000
+    if millis and millis > now_millis:
+        return False
+    return True
+
+
+class FixtureSampler:
+    """
+    Draws fixtures at random and fetches their details concurrently until
+    `target` usable matches have been collected or candidates run out.
+
+    With `stratify`, the next fixture drawn is always one whose teams have the
+    fewest accepted (or in-flight) matches so far, so each club ends up
+    represented roughly evenly.
+
+    Fixtures in `negative_cache` are skipped without fetching, and newly
+    rejected fixtures are recorded there.
+    """
+
+    def __init__(
+        self,
+        client: PLClient,
+        target: int,
+        workers: int = 4,
+        stratify: bool = False,
+        rng: random.Random | None = None,
+        negative_cache: NegativeCache | None = None,
+    ):
+        self.client = client
+        self.target = target
+        self.workers = workers
+        self.stratify = stratify
+        self.rng = rng or random.Random()
+        self.negative_cache = negative_cache
+        self.fetched = 0
+
+    def _next_candidate(self, candidates: list[dict], team_counts: Counter) -> dict:
+        if not self.stratify:
+            return candidates.pop()
+        best = min(
+            range(len(candidates)),
+            key=lambda i: sum(team_counts[name] for name in team_names(candidates[i])),
+        )
+        return candidates.pop(best)
+
+    def _fetch(self, fixture_id: int) -> tuple[dict | None, str | None]:
+        return check_match(self.client.get_match_detail(fixture_id))
+
+    def sample(self, fixtures: list[dict]) -> list[tuple[int, dict]]:
+        """Return up to `target` (fixture ID, parsed match) pairs from the listing."""
+        candidates = [f for f in fixtures if is_candidate(f)]
+        logger.info(f"  {len(candidates)} of {len(fixtures)} fixtures pass the listing filter")
+        if self.negative_cache is not None:
+            before = len(candidates)
+            candidates = [f for f in candidates if int(f["id"]) not in self.negative_cache]
+            if before != len(candidates):
+                logger.info(f"  Skipping {before - len(candidates)} fixtures known to be unusable")
+        # Shuffle once; unstratified draws pop from the end, stratified ties keep this order
+        self.rng.shuffle(candidates)
+
+        accepted: list[tuple[int, dict]] = []
+        team_counts: Counter = Counter()
+        in_flight: dict[Future, dict] = {}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while True:
+                while candidates and len(in_flight) < self.workers and len(accepted) + len(in_flight) < self.target:
+                    fixture = self._next_candidate(candidates, team_counts)
+                    # Count in-flight fixtures towards their teams so parallel draws spread out
+                    team_counts.update(team_names(fixture))
+                    in_flight[pool.submit(self._fetch, int(fixture["id"]))] = fixture
+
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    fixture = in_flight.pop(future)
+                    fid = int(fixture["id"])
+                    self.fetched += 1
+                    try:
+                        parsed, reason = future.result()
+                    except Exception as e:
+                        logger.warning(f"  Failed fixture {fid}: {e}")
+                        parsed, reason = None, None
+                    if parsed:
+                        accepted.append((fid, parsed))
+                    else:
+                        if reason:
+                            logger.debug(f"  Skipping {fid}: {reason}")
+                            if self.negative_cache is not None:
+                                self.negative_cache.add(fid, reason)
+                        team_counts.subtract(team_names(fixture))
+
+                    if self.fetched % 10 == 0:
+                        logger.info(f"  Progress: {self.fetched} fetched ({len(accepted)}/{self.target} valid)")
+
+        return accepted
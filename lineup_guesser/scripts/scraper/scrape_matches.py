@@ -5,33 +5,36 @@ Scrape Premier League match lineups from the PulseLive API.
 Usage:
     python scrape_matches.py [--per-season 30] [--output ../../src/data/matches.json]
     python scrape_matches.py --min-season-id 21 --per-season 30  # Only 2012/13+ (has formations)
+    python scrape_matches.py --per-season 40 --stratify --workers 8
 """
 
 import argparse
 import logging
-import random
-from pathlib import Path
 
-from fbref_client import PLClient
-from parsers import parse_match
-from transform import transform_all
+from pipeline import Pipeline, write_fixture_ids
+from sampling import FixtureSampler
+from workspace import Workspace
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s %(levelname)s %(message)s",
-)
 logger = logging.getLogger(__name__)
 
-DEFAULT_OUTPUT = Path(__file__).parent / "../../src/data/matches.json"
 
-
-def main():
-    parser = argparse.ArgumentParser(description="Scrape PL lineups from PulseLive API")
+def add_arguments(parser: argparse.ArgumentParser):
     parser.add_argument(
         "--per-season",
         type=int,
         default=100,
-        help="Number of matches to sample per season (default: 100)",
+        help="Number of valid matches to collect per season (default: 100)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Concurrent fixture detail fetches (default: 4)",
+    )
+    parser.add_argument(
+        "--stratify",
+        action="store_true",
+        help="Balance the sample so each team is represented evenly",
     )
     parser.add_argument(
         "--min-season-id",
@@ -39,15 +42,11 @@ def main():
         default=14,
         help="Minimum season ID to scrape (14=2005/06). Use 21 for 2012/13+ only (has explicit formations).",
     )
-    parser.add_argument(
-        "--output",
-        type=Path,
-        default=DEFAULT_OUTPUT,
-        help="Output JSON file path",
-    )
-    args = parser.parse_args()
 
-    client = PLClient()
+
+def run(args: argparse.Namespace, workspace: Workspace):
+    client = workspace.client
+    negative_cache = workspace.negative_cache
 
     # Get all seasons
     logger.info("Fetching season list...")
@@ -58,54 +57,67 @@ def main():
     seasons = [s for s in seasons if int(s.get("id", 0)) >= args.min_season_id]
     logger.info(f"Will process {len(seasons)} seasons (IDs {seasons[0]['id']}–{seasons[-1]['id']})")
 
-    all_raw_matches: list[dict] = []
+    all_fixture_ids: list[int] = []
 
     for season in seasons:
         season_id = int(season["id"])
         season_label = season.get("label", str(season_id))
         logger.info(f"Processing season {season_label} (ID {season_id})...")
 
-        # Get all fixture IDs for this season
-        fixture_ids = client.get_all_fixture_ids(season_id)
-        logger.info(f"  Found {len(fixture_ids)} fixtures")
+        # Listing metadata lets the sampler skip unplayed fixtures before fetching details
+        fixtures = client.get_all_fixtures(season_id)
+        logger.info(f"  Found {len(fixtures)} fixtures")
 
-        if not fixture_ids:
+        if not fixtures:
             continue
 
-        # Sample
-        sample_size = min(args.per_season, len(fixture_ids))
-        sampled_ids = random.sample(fixture_ids, sample_size)
-        logger.info(f"  Sampling {sample_size} matches")
-
-        success = 0
-        for i, fid in enumerate(sampled_ids):
-            try:
-                detail = client.get_match_detail(fid)
-                parsed = parse_match(detail)
-                if parsed:
-                    # Check that we have formations (crucial for the game)
-                    home_formation = parsed["home_lineup"].get("formation", "")
-                    away_formation = parsed["away_lineup"].get("formation", "")
-                    if not home_formation or not away_formation:
-                        logger.debug(f"  Skipping {fid}: missing formation")
-                        continue
-                    all_raw_matches.append(parsed)
-                    success += 1
-                else:
-                    logger.debug(f"  Skipping {fid}: incomplete data")
-            except Exception as e:
-                logger.warning(f"  Failed fixture {fid}: {e}")
-
-            if (i + 1) % 10 == 0:
-                logger.info(f"  Progress: {i+1}/{sample_size} ({success} valid)")
+        sampler = FixtureSampler(
+            client,
+            args.per_season,
+            workers=args.workers,
+            stratify=args.stratify,
+            negative_cache=negative_cache,
+        )
+        accepted = sampler.sample(fixtures)
+        negative_cache.save()
+        all_fixture_ids.extend(fid for fid, _ in accepted)
+        success = len(accepted)
 
         logger.info(f"  Got {success} valid matches from {season_label}")
 
-    logger.info(f"Total raw matches: {len(all_raw_matches)}")
+    logger.info(f"Total raw matches: {len(all_fixture_ids)}")
+
+    # Record the selection so pipeline.py can rebuild from it, then transform and write
+    write_fixture_ids(all_fixture_ids, workspace.build_dir / "fixtures.json")
+    pipeline = Pipeline(
+        all_fixture_ids,
+        workspace.output_path,
+        client=client,
+        build_dir=workspace.build_dir,
+        cache_dir=workspace.cache_dir,
+        negative_cache=negative_cache,
+        store_path=workspace.store_path,
+    )
+    pipeline.run()
+    workspace.set_matches(pipeline.exported())
+
+    logger.info("Transfer statistics:")
+    client.log_transfer_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape PL lineups from PulseLive API")
+    Workspace.add_arguments(parser)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 
-    # Transform and write
-    count = transform_all(all_raw_matches, args.output)
-    logger.info(f"Wrote {count} matches to {args.output}")
+    workspace = Workspace.from_args(args)
+    try:
+        run(args, workspace)
+    finally:
+        workspace.close()
 
 
 if __name__ == "__main__":
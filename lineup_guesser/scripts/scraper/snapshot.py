@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Portable snapshots of the API response cache, so a fresh checkout or CI runner
+can rebuild matches.json without re-fetching every fixture.
+
+A snapshot is a gzip-compressed tar stream:
+
+- objects/<sha256>  one response payload (plain JSON) per distinct content
+- manifest.json     cache key → object, fetch time and endpoint type, plus the
+                    recorded fixture list; written last so export is one pass
+
+Objects are named by the hash of their content, so identical payloads are
+stored once and every object is verified as it is read. Import streams the
+archive (from a file or stdin), stages objects next to the cache and moves
+them into place once the manifest has been read. A local entry fetched at or
+after the snapshot's copy is kept, unless it is unreadable. If the archive is
+truncated or an object fails verification, nothing is placed for it.
+
+Usage:
+    python snapshot.py export cache-snapshot.tar.gz [--season 2015/16] [--competition 1]
+    python snapshot.py import cache-snapshot.tar.gz [--dry-run]
+    python snapshot.py verify cache-snapshot.tar.gz
+    python snapshot.py export - | ssh ci 'python snapshot.py import -'
+"""
+
+import argparse
+import gzip
+import io
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import tarfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from hashlib import sha256
+from pathlib import Path
+from typing import NamedTuple
+
+from cache_files import is_cache_entry, iter_entries, payload_bytes, read_cache_file, write_bytes_atomic
+from cache_tool import entry_kind
+from fbref_client import DEFAULT_CACHE_DIR
+from fixture_index import FixtureIndex
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+OBJECT_PREFIX = "objects/"
+OBJECT_NAME = re.compile(r"[0-9a-f]{64}")
+BATCH_SIZE = 2048  # entries handed to the workers at a time, bounding memory
+
+
+class ExportItem(NamedTuple):
+    key: str
+    kind: str
+    mtime: float
+    digest: str | None = None
+    payload: bytes | None = None
+    fixture_id: int | None = None
+    error: str | None = None
+
+
+def _comp_season(data, kind: str) -> dict:
+    if kind == "fixture_detail":
+        return data.get("compSeason") or {}
+    if kind == "fixtures" and data.get("content"):
+        return data["content"][0].get("compSeason") or {}
+    return {}
+
+
+def describe_entry(path: Path, seasons: frozenset[str], competitions: frozenset[int]) -> ExportItem | None:
+    """Read one entry and decide whether it belongs in the snapshot. Runs in a worker process."""
+    try:
+        mtime = path.stat().st_mtime
+        raw = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    try:
+        body = payload_bytes(raw)
+        data = json.loads(body)
+    except ValueError as e:
+        return ExportItem(path.stem, "corrupt", mtime, error=str(e))
+
+    kind = entry_kind(data)
+    # The season list is needed to scrape any season, so it is always included
+    if (seasons or competitions) and kind != "seasons":
+        comp_season = _comp_season(data, kind)
+        if not comp_season:
+            return None
+        if seasons and str(comp_season.get("id")) not in seasons and comp_season.get("label") not in seasons:
+            return None
+        competition = (comp_season.get("competition") or {}).get("id")
+        if competitions and (competition is None or int(competition) not in competitions):
+            return None
+
+    fixture_id = int(data["id"]) if kind == "fixture_detail" else None
+    return ExportItem(path.stem, kind, mtime, sha256(body).hexdigest(), body, fixture_id)
+
+
+def _describe_all(paths: list[Path], work, workers: int):
+    """Yield work(path) for every path, in order, a batch at a time."""
+    if workers <= 1 or len(paths) < 100:
+        yield from map(work, paths)
+        return
+    with ProcessPoolExecutor(workers) as pool:
+        for start in range(0, len(paths), BATCH_SIZE):
+            batch = paths[start : start + BATCH_SIZE]
+            yield from pool.map(work, batch, chunksize=max(1, len(batch) // (workers * 4)))
+
+
+def _add_member(tar: tarfile.TarFile, name: str, data: bytes, mtime: float):
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = int(mtime)
+    info.mode = 0o644
+    tar.addfile(info, fileobj=io.BytesIO(data))
+
+
+def _read_fixture_ids(cache_dir: Path) -> list[int]:
+    path = cache_dir / "build" / "fixtures.json"
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else []
+
+
+def export_snapshot(
+    cache_dir: Path,
+    out,
+    seasons: frozenset[str] = frozenset(),
+    competitions: frozenset[int] = frozenset(),
+    workers: int = 1,
+    level: int = 6,
+) -> dict:
+    """Write a snapshot of cache_dir to the binary file object out. Returns the manifest."""
+    paths = sorted(iter_entries(cache_dir))
+    work = partial(describe_entry, seasons=seasons, competitions=competitions)
+
+    entries: dict[str, dict] = {}
+    written: set[str] = set()
+    fixture_ids: set[int] = set()
+    object_bytes = corrupt = 0
+    with gzip.GzipFile(fileobj=out, mode="wb", compresslevel=level, mtime=0) as gz:
+        with tarfile.open(fileobj=gz, mode="w|", format=tarfile.PAX_FORMAT) as tar:
+            for item in _describe_all(paths, work, workers):
+                if item is None:
+                    continue
+                if item.error:
+                    logger.warning(f"  Skipping unreadable entry {item.key}: {item.error}")
+                    corrupt += 1
+                    continue
+                if item.digest not in written:
+                    _add_member(tar, OBJECT_PREFIX + item.digest, item.payload, item.mtime)
+                    written.add(item.digest)
+                    object_bytes += len(item.payload)
+                entries[item.key] = {"object": item.digest, "mtime": item.mtime, "kind": item.kind}
+                if item.fixture_id is not None:
+                    fixture_ids.add(item.fixture_id)
+
+            manifest = {
+                "format": FORMAT_VERSION,
+                "created": time.time(),
+                "filters": {"seasons": sorted(seasons), "competitions": sorted(competitions)},
+                "entries": entries,
+                # The recorded selection, limited to fixtures whose detail is in the snapshot
+                "fixture_ids": [fid for fid in _read_fixture_ids(cache_dir) if fid in fixture_ids],
+            }
+            _add_member(tar, MANIFEST_NAME, json.dumps(manifest).encode("utf-8"), time.time())
+
+    logger.info(
+        f"Exported {len(entries)} entries as {len(written)} objects "
+        f"({object_bytes / 1024**2:.1f} MiB uncompressed)"
+        + (f", skipped {corrupt} unreadable" if corrupt else "")
+    )
+    return manifest
+
+
+def _is_newer_locally(target: Path, mtime: float) -> bool:
+    """True if target exists, was fetched at or after mtime and is readable."""
+    try:
+        if target.stat().st_mtime < mtime:
+            return False
+        read_cache_file(target)
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def import_snapshot(source, cache_dir: Path, dry_run: bool = False) -> dict[str, int]:
+    """
+    Merge the snapshot read from the binary file object source into cache_dir.
+    With dry_run, only verify the archive. Returns counts per outcome.
+    """
+    counts = {"written": 0, "kept_newer": 0, "bad_objects": 0, "missing_objects": 0}
+    staging = cache_dir / f".snapshot-{os.getpid()}"
+    verified: set[str] = set()
+    manifest = None
+
+    if not dry_run:
+        staging.mkdir(parents=True, exist_ok=True)
+    try:
+        with tarfile.open(fileobj=source, mode="r|*") as tar:
+            for member in tar:
+                if not member.isfile():
+                    continue
+                body = tar.extractfile(member).read()
+                if member.name == MANIFEST_NAME:
+                    manifest = json.loads(body)
+                    continue
+                digest = member.name.removeprefix(OBJECT_PREFIX)
+                if not member.name.startswith(OBJECT_PREFIX) or not OBJECT_NAME.fullmatch(digest):
+                    logger.warning(f"  Ignoring unexpected archive member {member.name}")
+                    continue
+                if sha256(body).hexdigest() != digest:
+                    logger.warning(f"  Object {digest[:12]} does not match its hash, skipping")
+                    counts["bad_objects"] += 1
+                    continue
+                verified.add(digest)
+                if not dry_run:
+                    (staging / digest).write_bytes(body)
+
+        if manifest is None:
+            raise ValueError("archive has no manifest (truncated?)")
+        if manifest.get("format") != FORMAT_VERSION:
+            raise ValueError(f"unsupported snapshot format {manifest.get('format')!r}")
+
+        placed: list[tuple[str, str]] = []
+        for key, entry in manifest["entries"].items():
+            target = cache_dir / f"{key}.json"
+            if not is_cache_entry(target):
+                logger.warning(f"  Ignoring invalid cache key {key!r}")
+                continue
+            if entry["object"] not in verified:
+                counts["missing_objects"] += 1
+                continue
+            if _is_newer_locally(target, entry["mtime"]):
+                counts["kept_newer"] += 1
+                continue
+            counts["written"] += 1
+            if dry_run:
+                continue
+            # Objects can back several keys, so copy rather than move
+            write_bytes_atomic(target, (staging / entry["object"]).read_bytes())
+            os.utime(target, (entry["mtime"], entry["mtime"]))
+            placed.append((key, entry["kind"]))
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    if not dry_run and placed:
+        _index_placed(cache_dir, placed)
+        fixtures_file = cache_dir / "build" / "fixtures.json"
+        if manifest["fixture_ids"] and not fixtures_file.exists():
+            fixtures_file.parent.mkdir(parents=True, exist_ok=True)
+            fixtures_file.write_text(json.dumps(manifest["fixture_ids"]), encoding="utf-8")
+            logger.info(f"Recorded {len(manifest['fixture_ids'])} fixtures for pipeline.py")
+    return counts
+
+
+def _index_placed(cache_dir: Path, placed: list[tuple[str, str]]):
+    # Listings first so details can fill in on top of them
+    order = sorted(placed, key=lambda kv: kv[1] == "fixture_detail")
+    index = FixtureIndex(cache_dir / "index.sqlite")
+    try:
+        index.record_many((key, read_cache_file(cache_dir / f"{key}.json")) for key, _ in order)
+    finally:
+        index.close()
+
+
+def _open_output(path: str):
+    return sys.stdout.buffer if path == "-" else open(path, "wb")
+
+
+def _open_input(path: str):
+    return sys.stdin.buffer if path == "-" else open(path, "rb")
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Export or import a portable snapshot of the API cache")
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR, help="Cache directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    e = sub.add_parser("export", help="Write the cache to a snapshot archive")
+    e.add_argument("archive", help="Archive path, or - for stdout")
+    e.add_argument("--season", action="append", default=[], help="Season label (2015/16) or ID; repeatable")
+    e.add_argument("--competition", type=int, action="append", default=[], help="Competition ID; repeatable")
+    e.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    e.add_argument("--level", type=int, default=6, choices=range(1, 10), metavar="1-9", help="Gzip level")
+
+    i = sub.add_parser("import", help="Merge a snapshot archive into the cache")
+    i.add_argument("archive", help="Archive path, or - for stdin")
+    i.add_argument("--dry-run", action="store_true", help="Verify and report without writing")
+
+    v = sub.add_parser("verify", help="Check every object in a snapshot archive against its hash")
+    v.add_argument("archive", help="Archive path, or - for stdin")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    started = time.time()
+
+    if args.command == "export":
+        out = _open_output(args.archive)
+        try:
+            export_snapshot(
+                args.cache_dir,
+                out,
+                seasons=frozenset(args.season),
+                competitions=frozenset(args.competition),
+                workers=args.workers,
+                level=args.level,
+            )
+        finally:
+            if out is not sys.stdout.buffer:
+                out.close()
+    else:
+        source = _open_input(args.archive)
+        try:
+            counts = import_snapshot(source, args.cache_dir, dry_run=args.command != "import" or args.dry_run)
+        except (tarfile.TarError, EOFError, OSError, ValueError) as e:
+            logger.error(f"Could not read snapshot: {e}")
+            sys.exit(1)
+        finally:
+            if source is not sys.stdin.buffer:
+                source.close()
+        verb = "Would write" if args.command != "import" or args.dry_run else "Wrote"
+        logger.info(
+            f"{verb} {counts['written']} entries, kept {counts['kept_newer']} newer local entries"
+        )
+        if counts["bad_objects"] or counts["missing_objects"]:
+            logger.error(
+                f"{counts['bad_objects']} objects failed verification, "
+                f"{counts['missing_objects']} entries reference missing objects"
+            )
+            sys.exit(1)
+
+    logger.info(f"Done in {time.time() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,160 +2,171 @@
 
 import json
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
 from normalize import normalize_name, extract_last_name
 from formation_mapper import formation_to_positions
 
-# Common nationality → flag emoji map
-NATIONALITY_FLAGS: dict[str, str] = {
-    "Afghanistan": "\U0001f1e6\U0001f1eb",
-    "Albania": "\U0001f1e6\U0001f1f1",
-    "Algeria": "\U0001f1e9\U0001f1ff",
-    "Argentina": "\U0001f1e6\U0001f1f7",
-    "Australia": "\U0001f1e6\U0001f1fa",
-    "Austria": "\U0001f1e6\U0001f1f9",
-    "Belgium": "\U0001f1e7\U0001f1ea",
-    "Brazil": "\U0001f1e7\U0001f1f7",
-    "Bulgaria": "\U0001f1e7\U0001f1ec",
-    "Cameroon": "\U0001f1e8\U0001f1f2",
-    "Canada": "\U0001f1e8\U0001f1e6",
-    "Chile": "\U0001f1e8\U0001f1f1",
-    "Colombia": "\U0001f1e8\U0001f1f4",
-    "Costa Rica": "\U0001f1e8\U0001f1f7",
-    "Croatia": "\U0001f1ed\U0001f1f7",
-    "Czech Republic": "\U0001f1e8\U0001f1ff",
-    "Czechia": "\U0001f1e8\U0001f1ff",
-    "Denmark": "\U0001f1e9\U0001f1f0",
-    "DR Congo": "\U0001f1e8\U0001f1e9",
-    "Ecuador": "\U0001f1ea\U0001f1e8",
-    "Egypt": "\U0001f1ea\U0001f1ec",
-    "England": "\U0001F3F4\U000E0067\U000E0062\U000E0065\U000E006E\U000E0067\U000E007F",
-    "Finland": "\U0001f1eb\U0001f1ee",
-    "France": "\U0001f1eb\U0001f1f7",
-    "Gabon": "\U0001f1ec\U0001f1e6",
-    "Georgia": "\U0001f1ec\U0001f1ea",
-    "Germany": "\U0001f1e9\U0001f1ea",
-    "Ghana": "\U0001f1ec\U0001f1ed",
-    "Greece": "\U0001f1ec\U0001f1f7",
-    "Guinea": "\U0001f1ec\U0001f1f3",
-    "Honduras": "\U0001f1ed\U0001f1f3",
-    "Hungary": "\U0001f1ed\U0001f1fa",
-    "Iceland": "\U0001f1ee\U0001f1f8",
-    "Iran": "\U0001f1ee\U0001f1f7",
-    "Ireland": "\U0001f1ee\U0001f1ea",
-    "Republic of Ireland": "\U0001f1ee\U0001f1ea",
-    "Israel": "\U0001f1ee\U0001f1f1",
-    "Italy": "\U0001f1ee\U0001f1f9",
-    "Ivory Coast": "\U0001f1e8\U0001f1ee",
-    "Jamaica": "\U0001f1ef\U0001f1f2",
-    "Japan": "\U0001f1ef\U0001f1f5",
-    "Kenya": "\U0001f1f0\U0001f1ea",
-    "Mexico": "\U0001f1f2\U0001f1fd",
-    "Morocco": "\U0001f1f2\U0001f1e6",
-    "Netherlands": "\U0001f1f3\U0001f1f1",
-    "New Zealand": "\U0001f1f3\U0001f1ff",
-    "Nigeria": "\U0001f1f3\U0001f1ec",
-    "Northern Ireland": "\U0001F1EC\U0001F1E7",
-    "Norway": "\U0001f1f3\U0001f1f4",
-    "Paraguay": "\U0001f1f5\U0001f1fe",
-    "Peru": "\U0001f1f5\U0001f1ea",
-    "Poland": "\U0001f1f5\U0001f1f1",
-    "Portugal": "\U0001f1f5\U0001f1f9",
-    "Romania": "\U0001f1f7\U0001f1f4",
-    "Russia": "\U0001f1f7\U0001f1fa",
-    "Scotland": "\U0001F3F4\U000E0067\U000E0062\U000E0073\U000E0063\U000E0074\U000E007F",
-    "Senegal": "\U0001f1f8\U0001f1f3",
-    "Serbia": "\U0001f1f7\U0001f1f8",
-    "Slovakia": "\U0001f1f8\U0001f1f0",
-    "Slovenia": "\U0001f1f8\U0001f1ee",
-    "South Africa": "\U0001f1ff\U0001f1e6",
-    "South Korea": "\U0001f1f0\U0001f1f7",
-    "Spain": "\U0001f1ea\U0001f1f8",
-    "Sweden": "\U0001f1f8\U0001f1ea",
-    "Switzerland": "\U0001f1e8\U0001f1ed",
-    "Togo": "\U0001f1f9\U0001f1ec",
-    "Tunisia": "\U0001f1f9\U0001f1f3",
-    "Turkey": "\U0001f1f9\U0001f1f7",
-    "Ukraine": "\U0001f1fa\U0001f1e6",
-    "United States": "\U0001f1fa\U0001f1f8",
-    "Uruguay": "\U0001f1fa\U0001f1fe",
-    "Venezuela": "\U0001f1fb\U0001f1ea",
-    "Wales": "\U0001F3F4\U000E0067\U000E0062\U000E0077\U000E006C\U000E0073\U000E007F",
-    "Zambia": "\U0001f1ff\U0001f1f2",
-    "Zimbabwe": "\U0001f1ff\U0001f1fc",
-    "Cote d'Ivoire": "\U0001f1e8\U0001f1ee",
-    "Mali": "\U0001f1f2\U0001f1f1",
-    "Benin": "\U0001f1e7\U0001f1ef",
-    "Congo DR": "\U0001f1e8\U0001f1e9",
-    "Gambia": "\U0001f1ec\U0001f1f2",
-    "Guinea-Bissau": "\U0001f1ec\U0001f1fc",
-    "Kosovo": "\U0001f1fd\U0001f1f0",
-    "Burkina Faso": "\U0001f1e7\U0001f1eb",
-    "Sierra Leone": "\U0001f1f8\U0001f1f1",
-    "Mozambique": "\U0001f1f2\U0001f1ff",
-    "Bosnia & Herzegovina": "\U0001f1e7\U0001f1e6",
-    "Bosnia and Herzegovina": "\U0001f1e7\U0001f1e6",
-    "Cote D'Ivoire": "\U0001f1e8\U0001f1ee",
-    "Côte d'Ivoire": "\U0001f1e8\U0001f1ee",
-    "Uzbekistan": "\U0001f1fa\U0001f1ff",
-    "Antigua & Barbuda": "\U0001f1e6\U0001f1ec",
-    "Antigua and Barbuda": "\U0001f1e6\U0001f1ec",
-    "Trinidad & Tobago": "\U0001f1f9\U0001f1f9",
-    "Trinidad and Tobago": "\U0001f1f9\U0001f1f9",
-    "Korea Republic": "\U0001f1f0\U0001f1f7",
-    "Grenada": "\U0001f1ec\U0001f1e9",
-    "Congo": "\U0001f1e8\U0001f1ec",
-    "Montserrat": "\U0001f1f2\U0001f1f8",
-    "Curacao": "\U0001f1e8\U0001f1fc",
-    "Curaçao": "\U0001f1e8\U0001f1fc",
-    "St Kitts & Nevis": "\U0001f1f0\U0001f1f3",
-    "Saint Kitts and Nevis": "\U0001f1f0\U0001f1f3",
-    "Angola": "\U0001f1e6\U0001f1f4",
-    "China PR": "\U0001f1e8\U0001f1f3",
-    "Philippines": "\U0001f1f5\U0001f1ed",
-    "Tanzania": "\U0001f1f9\U0001f1ff",
-    "Mauritania": "\U0001f1f2\U0001f1f7",
-    "Cape Verde": "\U0001f1e8\U0001f1fb",
-    "North Macedonia": "\U0001f1f2\U0001f1f0",
-    "Montenegro": "\U0001f1f2\U0001f1ea",
-    "Latvia": "\U0001f1f1\U0001f1fb",
-    "Lithuania": "\U0001f1f1\U0001f1f9",
-    "Luxembourg": "\U0001f1f1\U0001f1fa",
-    "Estonia": "\U0001f1ea\U0001f1ea",
-    "Madagascar": "\U0001f1f2\U0001f1ec",
-    "Armenia": "\U0001f1e6\U0001f1f2",
-    "Bangladesh": "\U0001f1e7\U0001f1e9",
-    "Barbados": "\U0001f1e7\U0001f1e7",
-    "Dominican Republic": "\U0001f1e9\U0001f1f4",
-    "Equatorial Guinea": "\U0001f1ec\U0001f1f6",
-    "Guatemala": "\U0001f1ec\U0001f1f9",
-    "Haiti": "\U0001f1ed\U0001f1f9",
-    "Indonesia": "\U0001f1ee\U0001f1e9",
-    "Oman": "\U0001f1f4\U0001f1f2",
-    "Turkiye": "\U0001f1f9\U0001f1f7",
-    "St. Kitts & Nevis": "\U0001f1f0\U0001f1f3",
-    "Burundi": "\U0001f1e7\U0001f1ee",
-    "Cote D\u2019Ivoire": "\U0001f1e8\U0001f1ee",
-    "Cuba": "\U0001f1e8\U0001f1fa",
-}
+
+@lru_cache(maxsize=None)
+def _flag_tables() -> tuple[dict[str, str], dict[str, str]]:
+    """Nationality → flag emoji, plus a lower-cased copy. Built on first use, not at import."""
+    # Common nationality → flag emoji map
+    flags = {
+        "Afghanistan": "\U0001f1e6\U0001f1eb",
+        "Albania": "\U0001f1e6\U0001f1f1",
+        "Algeria": "\U0001f1e9\U0001f1ff",
+        "Argentina": "\U0001f1e6\U0001f1f7",
+        "Australia": "\U0001f1e6\U0001f1fa",
+        "Austria": "\U0001f1e6\U0001f1f9",
+        "Belgium": "\U0001f1e7\U0001f1ea",
+        "Brazil": "\U0001f1e7\U0001f1f7",
+        "Bulgaria": "\U0001f1e7\U0001f1ec",
+        "Cameroon": "\U0001f1e8\U0001f1f2",
+        "Canada": "\U0001f1e8\U0001f1e6",
+        "Chile": "\U0001f1e8\U0001f1f1",
+        "Colombia": "\U0001f1e8\U0001f1f4",
+        "Costa Rica": "\U0001f1e8\U0001f1f7",
+        "Croatia": "\U0001f1ed\U0001f1f7",
+        "Czech Republic": "\U0001f1e8\U0001f1ff",
+        "Czechia": "\U0001f1e8\U0001f1ff",
+        "Denmark": "\U0001f1e9\U0001f1f0",
+        "DR Congo": "\U0001f1e8\U0001f1e9",
+        "Ecuador": "\U0001f1ea\U0001f1e8",
+        "Egypt": "\U0001f1ea\U0001f1ec",
+        "England": "\U0001F3F4\U000E0067\U000E0062\U000E0065\U000E006E\U000E0067\U000E007F",
+        "Finland": "\U0001f1eb\U0001f1ee",
+        "France": "\U0001f1eb\U0001f1f7",
+        "Gabon": "\U0001f1ec\U0001f1e6",
+        "Georgia": "\U0001f1ec\U0001f1ea",
+        "Germany": "\U0001f1e9\U0001f1ea",
+        "Ghana": "\U0001f1ec\U0001f1ed",
+        "Greece": "\U0001f1ec\U0001f1f7",
+        "Guinea": "\U0001f1ec\U0001f1f3",
+        "Honduras": "\U0001f1ed\U0001f1f3",
+        "Hungary": "\U0001f1ed\U0001f1fa",
+        "Iceland": "\U0001f1ee\U0001f1f8",
+        "Iran": "\U0001f1ee\U0001f1f7",
+        "Ireland": "\U0001f1ee\U0001f1ea",
+        "Republic of Ireland": "\U0001f1ee\U0001f1ea",
+        "Israel": "\U0001f1ee\U0001f1f1",
+        "Italy": "\U0001f1ee\U0001f1f9",
+        "Ivory Coast": "\U0001f1e8\U0001f1ee",
+        "Jamaica": "\U0001f1ef\U0001f1f2",
+        "Japan": "\U0001f1ef\U0001f1f5",
+        "Kenya": "\U0001f1f0\U0001f1ea",
+        "Mexico": "\U0001f1f2\U0001f1fd",
+        "Morocco": "\U0001f1f2\U0001f1e6",
+        "Netherlands": "\U0001f1f3\U0001f1f1",
+        "New Zealand": "\U0001f1f3\U0001f1ff",
+        "Nigeria": "\U0001f1f3\U0001f1ec",
+        "Northern Ireland": "\U0001F1EC\U0001F1E7",
+        "Norway": "\U0001f1f3\U0001f1f4",
+        "Paraguay": "\U0001f1f5\U0001f1fe",
+        "Peru": "\U0001f1f5\U0001f1ea",
+        "Poland": "\U0001f1f5\U0001f1f1",
+        "Portugal": "\U0001f1f5\U0001f1f9",
+        "Romania": "\U0001f1f7\U0001f1f4",
+        "Russia": "\U0001f1f7\U0001f1fa",
+        "Scotland": "\U0001F3F4\U000E0067\U000E0062\U000E0073\U000E0063\U000E0074\U000E007F",
+        "Senegal": "\U0001f1f8\U0001f1f3",
+        "Serbia": "\U0001f1f7\U0001f1f8",
+        "Slovakia": "\U0001f1f8\U0001f1f0",
+        "Slovenia": "\U0001f1f8\U0001f1ee",
+        "South Africa": "\U0001f1ff\U0001f1e6",
+        "South Korea": "\U0001f1f0\U0001f1f7",
+        "Spain": "\U0001f1ea\U0001f1f8",
+        "Sweden": "\U0001f1f8\U0001f1ea",
+        "Switzerland": "\U0001f1e8\U0001f1ed",
+        "Togo": "\U0001f1f9\U0001f1ec",
+        "Tunisia": "\U0001f1f9\U0001f1f3",
+        "Turkey": "\U0001f1f9\U0001f1f7",
+        "Ukraine": "\U0001f1fa\U0001f1e6",
+        "United States": "\U0001f1fa\U0001f1f8",
+        "Uruguay": "\U0001f1fa\U0001f1fe",
+        "Venezuela": "\U0001f1fb\U0001f1ea",
+        "Wales": "\U0001F3F4\U000E0067\U000E0062\U000E0077\U000E006C\U000E0073\U000E007F",
+        "Zambia": "\U0001f1ff\U0001f1f2",
+        "Zimbabwe": "\U0001f1ff\U0001f1fc",
+        "Cote d'Ivoire": "\U0001f1e8\U0001f1ee",
+        "Mali": "\U0001f1f2\U0001f1f1",
+        "Benin": "\U0001f1e7\U0001f1ef",
+        "Congo DR": "\U0001f1e8\U0001f1e9",
+        "Gambia": "\U0001f1ec\U0001f1f2",
+        "Guinea-Bissau": "\U0001f1ec\U0001f1fc",
+        "Kosovo": "\U0001f1fd\U0001f1f0",
+        "Burkina Faso": "\U0001f1e7\U0001f1eb",
+        "Sierra Leone": "\U0001f1f8\U0001f1f1",
+        "Mozambique": "\U0001f1f2\U0001f1ff",
+        "Bosnia & Herzegovina": "\U0001f1e7\U0001f1e6",
+        "Bosnia and Herzegovina": "\U0001f1e7\U0001f1e6",
+        "Cote D'Ivoire": "\U0001f1e8\U0001f1ee",
+        "Côte d'Ivoire": "\U0001f1e8\U0001f1ee",
+        "Uzbekistan": "\U0001f1fa\U0001f1ff",
+        "Antigua & Barbuda": "\U0001f1e6\U0001f1ec",
+        "Antigua and Barbuda": "\U0001f1e6\U0001f1ec",
+        "Trinidad & Tobago": "\U0001f1f9\U0001f1f9",
+        "Trinidad and Tobago": "\U0001f1f9\U0001f1f9",
+        "Korea Republic": "\U0001f1f0\U0001f1f7",
+        "Grenada": "\U0001f1ec\U0001f1e9",
+        "Congo": "\U0001f1e8\U0001f1ec",
+        "Montserrat": "\U0001f1f2\U0001f1f8",
+        "Curacao": "\U0001f1e8\U0001f1fc",
+        "Curaçao": "\U0001f1e8\U0001f1fc",
+        "St Kitts & Nevis": "\U0001f1f0\U0001f1f3",
+        "Saint Kitts and Nevis": "\U0001f1f0\U0001f1f3",
+        "Angola": "\U0001f1e6\U0001f1f4",
+        "China PR": "\U0001f1e8\U0001f1f3",
+        "Philippines": "\U0001f1f5\U0001f1ed",
+        "Tanzania": "\U0001f1f9\U0001f1ff",
+        "Mauritania": "\U0001f1f2\U0001f1f7",
+        "Cape Verde": "\U0001f1e8\U0001f1fb",
+        "North Macedonia": "\U0001f1f2\U0001f1f0",
+        "Montenegro": "\U0001f1f2\U0001f1ea",
+        "Latvia": "\U0001f1f1\U0001f1fb",
+        "Lithuania": "\U0001f1f1\U0001f1f9",
+        "Luxembourg": "\U0001f1f1\U0001f1fa",
+        "Estonia": "\U0001f1ea\U0001f1ea",
+        "Madagascar": "\U0001f1f2\U0001f1ec",
+        "Armenia": "\U0001f1e6\U0001f1f2",
+        "Bangladesh": "\U0001f1e7\U0001f1e9",
+        "Barbados": "\U0001f1e7\U0001f1e7",
+        "Dominican Republic": "\U0001f1e9\U0001f1f4",
+        "Equatorial Guinea": "\U0001f1ec\U0001f1f6",
+        "Guatemala": "\U0001f1ec\U0001f1f9",
+        "Haiti": "\U0001f1ed\U0001f1f9",
+        "Indonesia": "\U0001f1ee\U0001f1e9",
+        "Oman": "\U0001f1f4\U0001f1f2",
+        "Turkiye": "\U0001f1f9\U0001f1f7",
+        "St. Kitts & Nevis": "\U0001f1f0\U0001f1f3",
+        "Burundi": "\U0001f1e7\U0001f1ee",
+        "Cote D\u2019Ivoire": "\U0001f1e8\U0001f1ee",
+        "Cuba": "\U0001f1e8\U0001f1fa",
+    }
+    # Reversed so the first spelling wins when two keys differ only in case
+    return flags, {key.lower(): value for key, value in reversed(flags.items())}
+
+
+def __getattr__(name: str):
+    if name == "NATIONALITY_FLAGS":
+        return _flag_tables()[0]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_flag(nationality: str) -> str:
     """Get flag emoji for a nationality. Returns empty string if unknown."""
-    flag = NATIONALITY_FLAGS.get(nationality)
+    flags, flags_lower = _flag_tables()
+    flag = flags.get(nationality)
     if flag:
         return flag
     # Try normalizing curly quotes and special chars
     normalized = nationality.replace("\u2019", "'").replace("\u2018", "'")
-    flag = NATIONALITY_FLAGS.get(normalized)
+    flag = flags.get(normalized)
     if flag:
         return flag
     # Try case variations
-    for key, value in NATIONALITY_FLAGS.items():
-        if key.lower() == nationality.lower():
-            return value
-    return ""
+    return flags_lower.get(nationality.lower(), "")
 
 
 def calculate_age(birth_date: str, match_date: str) -> int:
@@ -254,6 +265,26 @@ def transform_match(raw_match: dict) -> dict | None:
     return result
 
 
+def serialize_matches(matches: list[dict]) -> str:
+    """Serialize transformed matches exactly as they are written to disk."""
+    return json.dumps(matches, ensure_ascii=False, indent=2)
+
+
+def write_matches(matches: list[dict], output_path: Path) -> bool:
+    """
+    Write transformed matches to JSON.
+    Leaves the file untouched (and returns False) if its content is unchanged.
+    """
+    content = serialize_matches(matches)
+    if output_path.exists() and output_path.read_text(encoding="utf-8") == content:
+        return False
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return True
+
+
 def transform_all(raw_matches: list[dict], output_path: Path) -> int:
     """Transform all raw matches and write to JSON."""
     transformed = []
@@ -262,8 +293,6 @@ def transform_all(raw_matches: list[dict], output_path: Path) -> int:
         if match:
             transformed.append(match)
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(transformed, f, ensure_ascii=False, indent=2)
+    write_matches(transformed, output_path)
 
     return len(transformed)
@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-"""Validate the generated matches.json dataset."""
+"""Validate the generated matches.json dataset (or the dataset store, given a .sqlite path)."""
 
 import json
 import sys
@@ -15,9 +15,32 @@ VALID_POSITIONS = {"GK", "DEF", "MID", "FWD"}
 
 
 def validate(path: Path) -> bool:
-    with open(path, encoding="utf-8") as f:
-        matches = json.load(f)
+    if path.suffix == ".sqlite":
+        # Validate the dataset store directly, without exporting it first
+        from dataset_store import DatasetStore
 
+        store = DatasetStore(path)
+        matches = store.export_matches()
+        store.close()
+    else:
+        with open(path, encoding="utf-8") as f:
+            matches = json.load(f)
+
+    return validate_matches(matches)
+
+
+def add_arguments(parser):
+    parser.add_argument("path", type=Path, nargs="?", help="matches.json or a .sqlite store (default: the current dataset)")
+
+
+def run(args, workspace) -> bool:
+    """Validate the given file, or the dataset already loaded in the workspace."""
+    if args.path:
+        return validate(args.path)
+    return validate_matches(workspace.matches())
+
+
+def validate_matches(matches: list[dict]) -> bool:
     errors = []
     warnings = []
 
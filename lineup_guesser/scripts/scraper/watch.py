@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Watch the current season and ingest fixtures as they complete.
+
+Each poll re-fetches only the current season's fixture listing. Fixtures that
+have moved to completed and are not yet in the dataset store get their match
+detail (re-fetched only if the cached copy predates full time), which is
+parsed, transformed and upserted into the store; matches.json is then
+re-exported. Between polls the process sleeps, and while no match is
+being played it sleeps until shortly before the next kickoff.
+
+Progress is kept in a cursor file, so a restart resumes where it stopped.
+SIGINT/SIGTERM finish the fixture in hand, save the cursor and exit.
+
+Usage:
+    python watch.py [--interval 600] [--output ../../src/data/matches.json]
+    python watch.py --once  # single poll, e.g. from cron
+"""
+
+import argparse
+import json
+import logging
+import signal
+import threading
+import time
+from pathlib import Path
+
+from dataset_store import DEFAULT_OUTPUT, DatasetStore
+from delta import DEFAULT_RELEASES_DIR
+from fbref_client import DEFAULT_CACHE_DIR, PLClient
+from hint_index import DEFAULT_HINTS_DIR
+from negative_cache import NegativeCache
+from parsers import REJECT_MISSING_TEAM_LISTS, check_match
+from pipeline import publish
+from sampling import COMPLETED_STATUS
+from transform import transform_match
+from workspace import Workspace
+
+logger = logging.getLogger(__name__)
+
+CURSOR_FILE = DEFAULT_CACHE_DIR / "watch_cursor.json"
+
+MATCH_WINDOW = 3 * 60 * 60  # seconds after kickoff a match may still be in progress
+LINEUP_GRACE = 2 * 24 * 60 * 60  # how long to wait for late team lists before giving up
+SEASON_REFRESH = 24 * 60 * 60  # how often to check whether a new season has started
+
+
+class WatchCursor:
+    """Persisted watch progress: current season and fixtures already handled."""
+
+    def __init__(self, path: Path = CURSOR_FILE):
+        self.path = path
+        self.season_id: int | None = None
+        self.handled: set[int] = set()
+        self.seasons_checked = 0.0
+        if path.exists():
+            data = json.loads(path.read_text(encoding="utf-8"))
+            self.season_id = data.get("season_id")
+            self.handled = set(data.get("handled", []))
+            self.seasons_checked = data.get("seasons_checked", 0.0)
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps(
+                {
+                    "season_id": self.season_id,
+                    "handled": sorted(self.handled),
+                    "seasons_checked": self.seasons_checked,
+                }
+            ),
+            encoding="utf-8",
+        )
+        tmp.replace(self.path)
+
+
+class Watcher:
+    def __init__(
+        self,
+        client: PLClient,
+        store: DatasetStore,
+        output_path: Path = DEFAULT_OUTPUT,
+        releases_dir: Path | None = DEFAULT_RELEASES_DIR,
+        hints_dir: Path = DEFAULT_HINTS_DIR,
+        cursor: WatchCursor | None = None,
+        negative_cache: NegativeCache | None = None,
+        interval: float = 600,
+        max_sleep: float = 6 * 60 * 60,
+    ):
+        self.client = client
+        self.store = store
+        self.output_path = output_path
+        self.releases_dir = releases_dir
+        self.hints_dir = hints_dir
+        # Defaults live in the client's cache dir; an empty NegativeCache is falsy, so test for None
+        if cursor is None:
+            cursor = WatchCursor(client.cache_dir / "watch_cursor.json")
+        if negative_cache is None:
+            negative_cache = NegativeCache(client.cache_dir / "rejected.json")
+        self.cursor = cursor
+        self.negative_cache = negative_cache
+        self.interval = interval
+        self.max_sleep = max_sleep
+        self.stop_event = threading.Event()
+
+    def stop(self, *_):
+        logger.info("Stopping after the current step...")
+        self.stop_event.set()
+
+    def _current_season(self) -> int:
+        now = time.time()
+        if self.cursor.season_id is None or now - self.cursor.seasons_checked > SEASON_REFRESH:
+            seasons = self.client.get_seasons(refresh=True)
+            latest = max(int(s["id"]) for s in seasons)
+            if latest != self.cursor.season_id:
+                logger.info(f"Watching season ID {latest}")
+                self.cursor.season_id = latest
+                self.cursor.handled.clear()
+            self.cursor.seasons_checked = now
+        return self.cursor.season_id
+
+    def poll(self) -> tuple[int, float]:
+        """
+        One pass over the current season. Returns (matches ingested, seconds until
+        the next poll is worth doing).
+        """
+        season_id = self._current_season()
+        fixtures = self.client.get_all_fixtures(season_id, refresh=True)
+        now_millis = time.time() * 1000
+
+        # Matches the store already has (e.g. from a full scrape) or that were deleted need no ingesting
+        known = self.store.match_ids() | self.store.deleted_ids()
+        ingested: list[dict] = []
+        for fixture in fixtures:
+            if self.stop_event.is_set():
+                break
+            fid = int(fixture["id"])
+            if fixture.get("status") != COMPLETED_STATUS or fid in self.cursor.handled or fid in self.negative_cache:
+                continue
+            if str(fid) in known:
+                self.cursor.handled.add(fid)
+                continue
+            match = self._ingest(fid, fixture, now_millis)
+            if match:
+                ingested.append(match)
+
+        if ingested:
+            self.store.upsert_matches(ingested, source="watch")
+            self._publish()
+            logger.info(f"Ingested {len(ingested)} new matches")
+        self.cursor.save()
+        self.negative_cache.save()
+
+        return len(ingested), self._next_poll_delay(fixtures, now_millis)
+
+    def _ingest(self, fixture_id: int, fixture: dict, now_millis: float) -> dict | None:
+        try:
+            detail = self.client.get_match_detail(fixture_id)
+            # A copy cached before full time would be missing the final data
+            if detail.get("status") != COMPLETED_STATUS:
+                detail = self.client.get_match_detail(fixture_id, refresh=True)
+        except Exception as e:
+            logger.warning(f"  Failed fixture {fixture_id}: {e}")
+            return None
+
+        parsed, reason = check_match(detail)
+        if reason:
+            kickoff = (fixture.get("kickoff") or {}).get("millis") or now_millis
+            if reason == REJECT_MISSING_TEAM_LISTS and now_millis - kickoff < LINEUP_GRACE * 1000:
+                logger.debug(f"  {fixture_id}: team lists not published yet, retrying later")
+                return None
+            logger.info(f"  Skipping {fixture_id}: {reason}")
+            self.negative_cache.add(fixture_id, reason)
+            self.cursor.handled.add(fixture_id)
+            return None
+
+        self.cursor.handled.add(fixture_id)
+        match = transform_match(parsed)
+        if match:
+            logger.info(f"  {match['date']} {match['homeTeam']} {match['score']} {match['awayTeam']}")
+        return match
+
+    def _publish(self):
+        publish(self.store.export_matches(), self.output_path, self.releases_dir, self.hints_dir)
+
+    def _next_poll_delay(self, fixtures: list[dict], now_millis: float) -> float:
+        """Poll every `interval` while a match may be in progress, otherwise sleep until the next kickoff."""
+        now = now_millis / 1000
+        # Kickoffs long past belong to postponed fixtures, not matches in progress
+        upcoming = [
+            kickoff / 1000
+            for f in fixtures
+            if f.get("status") != COMPLETED_STATUS
+            and (kickoff := (f.get("kickoff") or {}).get("millis"))
+            and kickoff / 1000 > now - MATCH_WINDOW
+        ]
+        if not upcoming:
+            return self.max_sleep
+        until_kickoff = min(upcoming) - now
+        if until_kickoff <= self.interval:
+            return self.interval
+        return min(self.max_sleep, until_kickoff)
+
+    def run(self, once: bool = False):
+        while not self.stop_event.is_set():
+            try:
+                _, delay = self.poll()
+            except Exception as e:
+                logger.warning(f"Poll failed: {e}")
+                delay = self.interval
+            if once:
+                break
+            logger.info(f"Next poll in {delay / 60:.0f} min")
+            self.stop_event.wait(delay)
+        self.cursor.save()
+        self.negative_cache.save()
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--interval", type=float, default=600, help="Seconds between polls around matches (default: 600)")
+    parser.add_argument("--max-sleep", type=float, default=6 * 60 * 60, help="Longest idle sleep in seconds")
+    parser.add_argument("--releases", type=Path, default=DEFAULT_RELEASES_DIR, help="Directory for version chain and deltas")
+    parser.add_argument("--hints", type=Path, default=DEFAULT_HINTS_DIR, help="Directory for the hint index files")
+    parser.add_argument("--once", action="store_true", help="Poll once and exit")
+
+
+def run(args: argparse.Namespace, workspace: Workspace):
+    watcher = Watcher(
+        workspace.client,
+        workspace.store,
+        output_path=workspace.output_path,
+        releases_dir=args.releases,
+        hints_dir=args.hints,
+        cursor=WatchCursor(workspace.cache_dir / "watch_cursor.json"),
+        negative_cache=workspace.negative_cache,
+        interval=args.interval,
+        max_sleep=args.max_sleep,
+    )
+    signal.signal(signal.SIGINT, watcher.stop)
+    signal.signal(signal.SIGTERM, watcher.stop)
+    watcher.run(once=args.once)
+    # Ingested matches went into the store; reload on next use
+    workspace.set_matches(None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest newly completed fixtures of the current season")
+    Workspace.add_arguments(parser)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    workspace = Workspace.from_args(args)
+    try:
+        run(args, workspace)
+    finally:
+        workspace.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Paths and shared resources for the scraper commands.
+
+A Workspace fixes the output, store and cache locations once. The API client,
+negative cache, dataset store and the loaded dataset are created on first use
+and then reused, so commands chained in one process (see cli.py) share one
+HTTP session and parse the dataset once.
+"""
+
+import json
+import logging
+from pathlib import Path
+
+from cache_files import DEFAULT_CACHE_DIR
+from dataset_store import DEFAULT_OUTPUT, DEFAULT_STORE_PATH
+
+logger = logging.getLogger(__name__)
+
+
+class Workspace:
+    def __init__(
+        self,
+        output_path: Path = DEFAULT_OUTPUT,
+        store_path: Path = DEFAULT_STORE_PATH,
+        cache_dir: Path = DEFAULT_CACHE_DIR,
+        stream_details: bool = False,
+    ):
+        self.output_path = output_path
+        self.store_path = store_path
+        self.cache_dir = cache_dir
+        self.stream_details = stream_details
+        self._client = None
+        self._negative_cache = None
+        self._store = None
+        self._matches: list[dict] | None = None
+
+    @staticmethod
+    def add_arguments(parser):
+        parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="Output JSON file path")
+        parser.add_argument("--store", type=Path, default=DEFAULT_STORE_PATH, help="Dataset store path")
+        parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR, help="API response cache directory")
+        parser.add_argument(
+            "--stream",
+            action="store_true",
+            help="Stream-parse fixture details, keeping only the fields the parser needs (needs ijson)",
+        )
+
+    @classmethod
+    def from_args(cls, args) -> "Workspace":
+        return cls(args.output, args.store, args.cache_dir, args.stream)
+
+    @property
+    def build_dir(self) -> Path:
+        return self.cache_dir / "build"
+
+    @property
+    def client(self):
+        if self._client is None:
+            from fbref_client import PLClient
+
+            self._client = PLClient(self.cache_dir, stream_details=self.stream_details)
+        return self._client
+
+    @property
+    def negative_cache(self):
+        if self._negative_cache is None:
+            from negative_cache import NegativeCache
+
+            self._negative_cache = NegativeCache(self.cache_dir / "rejected.json", use_bloom=True)
+        return self._negative_cache
+
+    @property
+    def store(self):
+        if self._store is None:
+            from dataset_store import DatasetStore
+
+            self._store = DatasetStore(self.store_path)
+        return self._store
+
+    def matches(self) -> list[dict]:
+        """The dataset, loaded once: from the store if it has any matches, else from the output file."""
+        if self._matches is None:
+            if self.store.match_ids():
+                self._matches = self.store.export_matches()
+            else:
+                logger.info(f"Dataset store is empty, reading {self.output_path}")
+                self._matches = json.loads(self.output_path.read_text(encoding="utf-8"))
+        return self._matches
+
+    def set_matches(self, matches: list[dict] | None):
+        """Record the dataset a command just produced; None makes the next matches() reload it."""
+        self._matches = matches
+
+    def close(self):
+        if self._negative_cache is not None:
+            self._negative_cache.save()
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+        if self._client is not None:
+            self._client.index.close()